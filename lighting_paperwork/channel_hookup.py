@@ -1,16 +1,19 @@
 """Generator for a channel hookup."""
 
 import logging
-from pathlib import Path
-from typing import Self, Unpack, override
+from typing import Unpack, override
 
 import numpy as np
 import pandas as pd
-from natsort import natsort_keygen
-from pandas.io.formats.style import Styler
-
-from lighting_paperwork.helpers import FontStyle
-from lighting_paperwork.paperwork import PaperworkGenerator, StyleDataParams, StyleFieldParams
+from pandas.io.formats.style_render import CSSDict
+
+from lighting_paperwork.helpers import FontStyle, natsort_order
+from lighting_paperwork.paperwork import (
+    PaperworkGenerator,
+    StyleDataParams,
+    StyleFieldParams,
+    TableStyler,
+)
 from lighting_paperwork.style import default_chan_style
 
 logger = logging.getLogger(__name__)
@@ -31,38 +34,55 @@ class ChannelHookup(PaperworkGenerator):
     col_widths = (10, 6, 13, 5, 13, 32, 21)
     display_name = "Channel Hookup"
     primary_col_name = "Chan"
+    filter_fields = (
+        "Channel",
+        "Absolute Address",
+        "Position",
+        "Unit Number",
+        "Purpose",
+        "Instrument Type",
+        "Wattage",
+        "Accessory String",
+        "Accessory Flag",
+        "Color",
+        "Gobo 1",
+        "Gobo 2",
+    )
 
     @override
-    def generate_df(self) -> Self:
+    def generate_base_df(self) -> pd.DataFrame:
         # Format data
-        filter_fields = [
-            "Channel",
-            "Absolute Address",
-            "Position",
-            "Unit Number",
-            "Purpose",
-            "Instrument Type",
-            "Wattage",
-            "Accessory String",
-            "Accessory Flag",
-            "Color",
-            "Gobo 1",
-            "Gobo 2",
-        ]
+        filter_fields = list(self.filter_fields)
         self.verify_filter_fields(filter_fields)
-        self.df = pd.DataFrame(self.vw_export[filter_fields], columns=filter_fields)
+        self.df = self.model.project(
+            [
+                "Channel",
+                "Addr",
+                "Position",
+                "Unit Number",
+                "Purpose",
+                "Instr Type & Load & Acc",
+                "Accessory Flag",
+                "Color & Gobo",
+            ]
+        )
 
         # Need to have a channel to show up in the channel hookup
         self.df["Channel"] = self.df["Channel"].replace("", np.nan)
         self.df = self.df.dropna(subset=["Channel"])
 
-        self.combine_instrtype().format_address_slash().combine_gelgobo()
-
         self.df = self.df.rename(columns={"Channel": "Chan", "Unit Number": "U#"})
-        self.df = self.df.sort_values(
-            by=["Chan", "Position", "U#", "Accessory Flag", "Addr"],
-            key=natsort_keygen(),  # type: ignore[reportArgumentType]
-        )
+        addr = self.df["Addr"]
+        self.df = self.df.iloc[
+            natsort_order(
+                self.df["Chan"],
+                self.df["Position"],
+                self.df["U#"],
+                self.df["Accessory Flag"],
+                # Unassigned addresses sort after assigned ones, however they are shown
+                addr.mask(addr == "", "~"),
+            )
+        ]
         self.df = self.df.reset_index(drop=True)
         self.df = self.df[
             [
@@ -76,51 +96,68 @@ class ChannelHookup(PaperworkGenerator):
             ]
         ]
 
-        self.repeated_index_val()
-        return self
+        return self.df  # type: ignore[reportReturnType]
 
     @override
+    def format_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        df["Addr"] = df["Addr"].replace("", self.formatting_quirks.empty_str)
+        self.repeated_index_val(df)
+        return df
+
     @staticmethod
-    def style_data(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
+    def column_css(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[str]:
+        """Return the font, width, and alignment CSS of each column."""
         if "chan_style" not in kwargs:
             kwargs["chan_style"] = default_chan_style
 
-        border_style = f"{kwargs['border_weight']}px solid black"
-        style_df = pd.DataFrame().reindex_like(df).astype(str)
-        # Set borders based on channel data
-        prev_row = (None, None)
-        for index, data in df.iterrows():
-            style_df.loc[index, :] = ""  # type: ignore[reportCallIssue, reportArgumentType]
-            if prev_row == (None, None):
-                style_df.loc[index, :] += f"border-bottom: {border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-                prev_row = (index, data)
-                continue
-
-            if data["Chan"] == kwargs["quirks"].empty_str:
-                style_df.loc[prev_row[0], :] += "border-bottom: none; "  # type: ignore[reportCallIssue, reportArgumentType]
-                style_df.loc[index, :] += f"border-bottom: {border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-            else:
-                style_df.loc[index, :] += f"border-bottom: {border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-
-            prev_row = (index, data)
-
-        # Set font based on column
-        for col_name in style_df:
-            style_df[col_name] += (
-                "vertical-align: middle; width: "
-                f"{kwargs['col_width'][style_df.columns.get_loc(col_name)]}%;"  # type: ignore[reportCallIssue, reportArgumentType]
-            )
+        col_css = []
+        for idx, col_name in enumerate(columns):
+            css = f"vertical-align: middle; width: {kwargs['col_width'][idx]}%;"
             if col_name == "Chan":
-                style_df[col_name] += f"{kwargs['chan_style'].to_css()}; "
+                css += f"{kwargs['chan_style'].to_css()}; "
             else:
-                style_df[col_name] += f"{kwargs['body_style'].to_css()}; "
+                css += f"{kwargs['body_style'].to_css()}; "
 
             if col_name in ["Chan", "U#", "Addr"]:
-                style_df[col_name] += "text-align: center; "
+                css += "text-align: center; "
             else:
-                style_df[col_name] += "text-align: left; "
+                css += "text-align: left; "
+            col_css.append(css)
 
-        return style_df
+        return col_css
+
+    @override
+    @staticmethod
+    def style_data(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
+        border_style = f"{kwargs['border_weight']}px solid black"
+        # Set borders based on channel data, no border within a repeated channel
+        next_repeated = (df["Chan"] == kwargs["quirks"].empty_str).shift(-1, fill_value=False)
+        row_css = f"border-bottom: {border_style}; " + pd.Series(
+            np.where(next_repeated, "border-bottom: none; ", ""), index=df.index
+        )
+
+        # Set font based on column
+        col_css = ChannelHookup.column_css(df.columns, **kwargs)
+
+        return PaperworkGenerator.broadcast_style(df, row_css, col_css)
+
+    @override
+    @staticmethod
+    def style_classes(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
+        next_repeated = (df["Chan"] == kwargs["quirks"].empty_str).shift(-1, fill_value=False)
+        return PaperworkGenerator.broadcast_style(
+            df, np.where(next_repeated, "run-continues", ""), [""] * len(df.columns)
+        )
+
+    @override
+    @staticmethod
+    def class_styles(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[CSSDict]:
+        return [
+            {"selector": "td", "props": f"border-bottom: {kwargs['border_weight']}px solid black;"},
+            *PaperworkGenerator.column_class_styles(ChannelHookup.column_css(columns, **kwargs)),
+            # No border within a repeated channel
+            {"selector": "td.run-continues", "props": "border-bottom: none;"},
+        ]
 
     @override
     @staticmethod
@@ -145,30 +182,19 @@ class ChannelHookup(PaperworkGenerator):
         return style
 
     @override
-    def _make_common(self) -> pd.io.formats.style.Styler:
-        self.generate_df()
-
-        styled = Styler.from_custom_template(
-            str(Path(__file__).parent / "templates"), "header_footer.tpl"
-        )(self.df)
-        styled = styled.apply(
-            type(self).style_data,
-            axis=None,
-            chan_style=self.chan_style,
-            body_style=self.style.body,
-            col_width=self.col_widths,
-            quirks=self.formatting_quirks,
-            border_weight=self.border_weight,
-        )
-        styled = styled.hide()
-        styled = styled.apply_index(
-            type(self).style_fields,  # type: ignore[reportArgumentType]
-            header_style=self.style.field,
-            col_width=self.col_widths,
-            border_weight=self.border_weight,
-            axis=1,
-        )
+    def style_params(self) -> StyleDataParams:
+        return {**super().style_params(), "chan_style": self.chan_style}
 
-        styled = styled.set_table_styles(self.pagebreak_repeated_index(), overwrite=False)
+    @override
+    def run_starts(self) -> np.ndarray:
+        # A repeated channel stays with the rows above it
+        return np.flatnonzero(self.df["Chan"] != self.formatting_quirks.empty_str)
+
+    @override
+    def _make_common(
+        self, *, css_classes: bool = False, stream: bool = False, rows: slice = slice(None)
+    ) -> TableStyler:
+        styled = super()._make_common(css_classes=css_classes, stream=stream, rows=rows)
+        styled = self.pagebreak_repeated_index(styled)
 
         return styled  # noqa: RET504
@@ -1,15 +1,13 @@
 """Generator for a color cut list."""
 
 import logging
-from typing import Self, Unpack, override
+from typing import Unpack, override
 
+import numpy as np
 import pandas as pd
-from natsort import natsort_keygen
+from pandas.io.formats.style_render import CSSDict
 
-from lighting_paperwork.helpers import (
-    Gel,
-    parse_frame_size,
-)
+from lighting_paperwork.helpers import natsort_order
 from lighting_paperwork.paperwork import PaperworkGenerator, StyleDataParams, StyleFieldParams
 
 logger = logging.getLogger(__name__)
@@ -21,80 +19,101 @@ class ColorCutList(PaperworkGenerator):
     col_widths = (34, 43, 23)
     page_width = 30
     display_name = "Color Cut List"
+    filter_fields = ("Color", "Frame Size")
 
     @override
-    def generate_df(self) -> Self:
-        filter_fields = ["Color", "Frame Size"]
+    def generate_base_df(self) -> pd.DataFrame:
+        filter_fields = list(self.filter_fields)
         self.verify_filter_fields(filter_fields)
-        self.df = pd.DataFrame(self.vw_export[filter_fields], columns=filter_fields)
-
-        # Separate colors and diffusion into dict list
-        color_dict: list[dict] = []
-        for _, row in self.df.iterrows():
-            framesize = parse_frame_size(row["Frame Size"])
-            all_gels = Gel.parse_gel(row["Color"])
-            for i in all_gels:
-                if i.name in ("", "N/C"):
-                    continue
-                color_dict.append(
-                    {
-                        "Color": i.name,
-                        "Frame Size": framesize,
-                        "Company": i.company,
-                        "Sort": i.name_sort,
-                    }
-                )
-
-        colors = pd.DataFrame.from_records(color_dict)
+
+        # One row per physical gel, along with the frame size of its instrument
+        colors = self.model.gels()
+        colors = colors[~colors["Color"].isin(["", "N/C"])]
+        frame_sizes = self.model.project(["Parsed Frame Size"])["Parsed Frame Size"]
+        colors["Frame Size"] = frame_sizes.reindex(colors.index)
+
         colors = (
             colors.groupby(["Color", "Frame Size", "Sort"])["Color"]
             .count()
             .reset_index(name="Count")
         )
-        colors = colors.sort_values(by=["Sort", "Frame Size"], key=natsort_keygen())  # type: ignore[reportCallIssue, reportArgumentType]
-        colors = colors.drop(["Sort"], axis=1)
+        colors = colors.iloc[natsort_order(colors["Sort"], colors["Frame Size"])]
+        return colors.drop(["Sort"], axis=1)
+
+    @override
+    def run_starts(self) -> np.ndarray:
+        # Repeats of the same color are hidden, so they stay with the first row
+        return np.flatnonzero(self.df["Color"] != self.df["Color"].shift())
 
-        self.df = colors
-        return self
+    @staticmethod
+    def column_css(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[str]:
+        """Return the font, width, and alignment CSS of each column."""
+        col_css = []
+        for idx, col_name in enumerate(columns):
+            css = (
+                f"{kwargs['body_style'].to_css()}; vertical-align: middle; "
+                f"width: {kwargs['col_width'][idx]}%; "
+            )
+
+            if col_name == ["Color"]:
+                css += "text-align: center; "
+            else:
+                css += "text-align: left; "
+            col_css.append(css)
+
+        return col_css
 
     @override
     @staticmethod
     def style_data(df: pd.DataFrame, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
         border_style = f"{kwargs['border_weight']}px solid black"
-        style_df = pd.DataFrame().reindex_like(df).astype(str)
-        # Set borders based on color data
-        prev_row = (None, None)
-        for index, data in df.iterrows():
-            style_df.loc[index, :] = ""  # type: ignore[reportCallIssue, reportArgumentType]
-            if prev_row[0] is None or prev_row[1] is None:
-                style_df.loc[index, :] += f"border-bottom: {border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-                prev_row = (index, data)
-                continue
-
-            if data["Color"] == prev_row[1]["Color"]:
-                style_df.loc[prev_row[0], "Color"] += "border-bottom: none; "  # type: ignore[reportCallIssue, reportArgumentType]
-                style_df.loc[index, "Color"] += f"color: {kwargs['quirks'].hidden_fmt}; "  # type: ignore[reportCallIssue, reportArgumentType]
-                style_df.loc[index, :] += f"border-bottom: {border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-            else:
-                style_df.loc[index, :] += f"border-bottom: {border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-
-            prev_row = (index, data)
 
         # Set font based on column
-        for col_name in style_df:
-            width_idx = style_df.columns.get_loc(col_name)
-            style_df[col_name] += (
-                f"{kwargs['body_style'].to_css()}; vertical-align: middle; "
-                f"width: {kwargs['col_width'][width_idx]}%; "  # type: ignore[reportCallIssue, reportArgumentType]
-            )
+        col_css = ColorCutList.column_css(df.columns, **kwargs)
+        style_df = PaperworkGenerator.broadcast_style(
+            df, f"border-bottom: {border_style}; ", col_css
+        )
 
-            if col_name == ["Color"]:
-                style_df[col_name] += "text-align: center; "
-            else:
-                style_df[col_name] += "text-align: left; "
+        # Set borders based on color data, hiding repeats of the same color
+        same_as_prev = df["Color"] == df["Color"].shift()
+        same_as_next = same_as_prev.shift(-1, fill_value=False)
+        color_css = (
+            pd.Series(
+                np.where(same_as_prev, f"color: {kwargs['quirks'].hidden_fmt}; ", ""),
+                index=df.index,
+            )
+            + f"border-bottom: {border_style}; "
+            + np.where(same_as_next, "border-bottom: none; ", "")
+        )
+        style_df["Color"] = color_css + col_css[df.columns.get_loc("Color")]
 
         return style_df
 
+    @override
+    @staticmethod
+    def style_classes(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
+        class_df = PaperworkGenerator.broadcast_style(df, "", [""] * len(df.columns))
+
+        same_as_prev = df["Color"] == df["Color"].shift()
+        same_as_next = same_as_prev.shift(-1, fill_value=False)
+        class_df["Color"] = (
+            pd.Series(np.where(same_as_prev, "repeat ", ""), index=df.index)
+            + np.where(same_as_next, "run-continues", "")
+        ).str.strip()
+
+        return class_df
+
+    @override
+    @staticmethod
+    def class_styles(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[CSSDict]:
+        return [
+            {"selector": "td", "props": f"border-bottom: {kwargs['border_weight']}px solid black;"},
+            *PaperworkGenerator.column_class_styles(ColorCutList.column_css(columns, **kwargs)),
+            # Hide repeats of the same color
+            {"selector": "td.repeat", "props": f"color: {kwargs['quirks'].hidden_fmt};"},
+            {"selector": "td.run-continues", "props": "border-bottom: none;"},
+        ]
+
     @override
     @staticmethod
     def style_fields(index: pd.Series, **kwargs: Unpack[StyleFieldParams]) -> list[str]:
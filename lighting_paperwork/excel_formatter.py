@@ -1,7 +1,9 @@
 """Formatters for Excel."""
 
 import logging
+from collections.abc import Iterable, Sequence
 from copy import copy
+from itertools import islice
 
 from openpyxl.cell.cell import Cell
 from openpyxl.styles import Alignment
@@ -23,9 +25,12 @@ PAGE_HEIGHT_INCHES = 11
 
 
 def page_setup(ws: Worksheet, rows_to_repeat: int = 0) -> None:
-    """Set the page size, margins, and default view."""
-    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT
-    ws.page_setup.paperSize = ws.PAPERSIZE_LETTER
+    """Set the page size, margins, and default view.
+
+    Write-only worksheets need this before their first row is written.
+    """
+    ws.page_setup.orientation = Worksheet.ORIENTATION_PORTRAIT
+    ws.page_setup.paperSize = Worksheet.PAPERSIZE_LETTER
     ws.print_options.horizontalCentered = True
     ws.sheet_view.view = "pageLayout"
 
@@ -72,9 +77,18 @@ def add_title(ws: Worksheet, name: str, show_info: ShowData | None = None) -> No
     ws.oddFooter.right.size = 12
 
 
-def set_col_widths(ws: Worksheet, width: tuple[int, ...], page_width: int) -> None:
+def set_col_widths(
+    ws: Worksheet,
+    width: tuple[int, ...],
+    page_width: int,
+    columns: int | None = None,
+) -> None:
     """Set the widths of a page in terms of % of a full page.
 
+    Sets the width of the first `columns` columns, by default every column in use.
+    Write-only worksheets don't know their columns, and need this before their
+        first row is written.
+
     Widths are provided in terms of percentages, but excel expects px
     Assume page width is 610px (experimentally derived)
     I think it's 96 ppi so 96 * usable page width?
@@ -82,14 +96,17 @@ def set_col_widths(ws: Worksheet, width: tuple[int, ...], page_width: int) -> No
     """
     width_px = [w * 0.01 * 610 * (page_width / 100) for w in width]
 
-    for i in range(1, ws.max_column + 1):
+    if columns is None:
+        columns = ws.max_column  # type: ignore[reportAttributeAccessIssue]
+
+    for i in range(1, columns + 1):
         # why tf do we divide by 7
         ws.column_dimensions[get_column_letter(i)].width = int(width_px[i - 1] / 7)
 
 
-def wrap_all_cells(ws: Worksheet) -> None:
-    """Force all cells to wrap text instead of overflow."""
-    for row in ws.iter_rows():
+def wrap_all_cells(ws: Worksheet, min_row: int | None = None, max_row: int | None = None) -> None:
+    """Force all cells to wrap text instead of overflow, optionally only in some rows."""
+    for row in ws.iter_rows(min_row=min_row, max_row=max_row):
         for cell in row:
             alignment = copy(cell.alignment)
             alignment.wrapText = True
@@ -97,10 +114,12 @@ def wrap_all_cells(ws: Worksheet) -> None:
 
 
 def add_section_header(
-    ws: Worksheet, text: str, fmt: FontStyle, end_col: int | None = None
+    ws: Worksheet, text: str, fmt: FontStyle, end_col: int | None = None, row: int | None = None
 ) -> None:
-    """Add a section header to the bottom of the worksheet."""
-    section_row = 1 if ws.max_row == 1 else ws.max_row + 1
+    """Add a section header to the worksheet, by default below everything else."""
+    section_row = row
+    if section_row is None:
+        section_row = 1 if ws.max_row == 1 else ws.max_row + 1
     if end_col is None:
         end_col = ws.max_column
 
@@ -116,14 +135,41 @@ def add_section_header(
     header_cell.alignment = Alignment(horizontal="left", vertical="center")
 
 
-def instr_schedule_pagebreaks(ws: Worksheet) -> None:
+def instr_schedule_pagebreaks(
+    ws: Worksheet, rows: Iterable[Sequence[object]] | None = None
+) -> None:
+    """Add pagebreaks to an instrument schedule sheet, see :func:`position_pagebreaks`.
+
+    Args:
+        ws: The instrument schedule sheet
+        rows: The cell values of each row of the sheet. By default they're read from the
+            sheet, which write-only sheets can't do.
+
+    """
+    if rows is None:
+        rows = islice(ws.iter_rows(values_only=True), ws.max_row - 1)  # type: ignore[reportAttributeAccessIssue]
+
+    for row in position_pagebreaks(rows):
+        ws.row_breaks.append(Break(id=row))
+
+
+def _cell_value(values: Sequence[object], col: int) -> object:
+    """Return the value in a 1-indexed column of a row, or None past the end of the row."""
+    return values[col - 1] if col <= len(values) else None
+
+
+def position_pagebreaks(rows: Iterable[Sequence[object]]) -> list[int]:
     """Generate pagebreaks to prevent linebreaks from splitting a position.
 
+    Takes the cell values of each row of an instrument schedule sheet, and returns
+        the rows to break the page after.
+
     Goal: each position should fit on a page (or at least take up a full page otherwise)
     Assumes that the excel sheet is using the default formatting.
     This is ridiculously janky.
     Please sneeze away from this function lest something gets bumped.
     """
+    breaks = []
     pos_start_index = 0
     last_height = 0
     cur_height = 0.0
@@ -136,33 +182,33 @@ def instr_schedule_pagebreaks(ws: Worksheet) -> None:
     TYPE_LINEBREAK_LEN = 30  # noqa: N806
     COLOR_LINEBREAK_LEN = 25  # noqa: N806
 
-    for row in range(1, ws.max_row):
+    for row, values in enumerate(rows, start=1):
         # calculate how long this position is
-        if ws.cell(row, 5).value is None and ws.cell(row, 1).value is None:
+        if _cell_value(values, 5) is None and _cell_value(values, 1) is None:
             # If no channel and no U#, end of position
             if last_height + cur_height > PAGE_HEIGHT:
                 # we don't want to add this position to the same page, add pagebreak
-                ws.row_breaks.append(Break(id=pos_start_index - 1))
+                breaks.append(pos_start_index - 1)
                 last_height = cur_height
             else:
                 last_height = last_height + cur_height + 0.22
 
             cur_height = 0
             logger.debug("Row %s is a end-of-section (%s)", row, cur_height)
-        elif ws.cell(row, 2).value is None and (not str(ws.cell(row, 1).value).isdigit()):
+        elif _cell_value(values, 2) is None and (not str(_cell_value(values, 1)).isdigit()):
             # This is a position title -> height of 0.33"
             cur_height += 0.33
             pos_start_index = row
             logger.debug("Row %s is a position title (%s)", row, cur_height)
-        elif ws.cell(row, 1).value == "U#":
+        elif _cell_value(values, 1) == "U#":
             # This is a col label row
             cur_height += 0.22
             logger.debug("Row %s is col label (%s)", row, cur_height)
-        elif ws.cell(row, 1).value is None or str(ws.cell(row, 1).value).isdigit():
+        elif _cell_value(values, 1) is None or str(_cell_value(values, 1)).isdigit():
             # Channel row
-            if ws.cell(row, 3).value is not None and (
-                len(str(ws.cell(row, 3).value)) > TYPE_LINEBREAK_LEN
-                or len(str(ws.cell(row, 4).value)) > COLOR_LINEBREAK_LEN
+            if _cell_value(values, 3) is not None and (
+                len(str(_cell_value(values, 3))) > TYPE_LINEBREAK_LEN
+                or len(str(_cell_value(values, 4))) > COLOR_LINEBREAK_LEN
             ):
                 # Double height
                 cur_height += 0.44
@@ -174,3 +220,5 @@ def instr_schedule_pagebreaks(ws: Worksheet) -> None:
             # dunno, assume it's a standard row
             cur_height += 0.22
             logger.debug("Row %s unknown type (%s)", row, cur_height)
+
+    return breaks
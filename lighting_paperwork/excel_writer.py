@@ -0,0 +1,195 @@
+"""Streaming Excel sheet writer.
+
+Exporting through pandas' `Styler.to_excel` gives every cell its own copy of its font,
+border, and alignment, which openpyxl only dedupes when the workbook is saved, and the
+whole workbook is held in memory until then. :class:`ExcelSheetWriter` instead appends
+rows to a write-only openpyxl worksheet as they are generated, and every cell refers to
+one of the named styles that :class:`ExcelStyles` registers once per workbook.
+"""
+
+import logging
+from collections.abc import Iterable, Sequence
+from copy import copy
+from dataclasses import astuple
+
+import numpy as np
+import pandas as pd
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+from pandas.io.formats.excel import CSSToExcelConverter
+
+from lighting_paperwork.helpers import FontStyle
+from lighting_paperwork.html_writer import DEFAULT_CHUNK_SIZE, HTMLTableWriter, css_declarations
+
+logger = logging.getLogger(__name__)
+
+
+def named_style_kwargs(xlstyle: dict[str, dict]) -> dict[str, object]:
+    """Build openpyxl style objects from the output of pandas' `CSSToExcelConverter`.
+
+    Only the parts of a style that the converter produces from paperwork CSS are kept:
+        font, the four sides of the border, alignment, fill, and number format.
+    """
+    style_kwargs: dict[str, object] = {}
+    if "font" in xlstyle:
+        style_kwargs["font"] = Font(**xlstyle["font"])
+    if "border" in xlstyle:
+        sides = {side: Side(**spec) for side, spec in xlstyle["border"].items()}
+        style_kwargs["border"] = Border(
+            left=sides.get("left"),
+            right=sides.get("right"),
+            top=sides.get("top"),
+            bottom=sides.get("bottom"),
+        )
+    if "alignment" in xlstyle:
+        style_kwargs["alignment"] = Alignment(**xlstyle["alignment"])
+    if "fill" in xlstyle:
+        style_kwargs["fill"] = PatternFill(**xlstyle["fill"])
+    if "number_format" in xlstyle:
+        style_kwargs["number_format"] = xlstyle["number_format"]["format_code"]
+
+    return style_kwargs
+
+
+class ExcelStyles:
+    """Registry of the named styles of a workbook.
+
+    Cells that look the same share one named style across every sheet of the workbook,
+        so the workbook's stylesheet only grows with the number of distinct styles.
+
+    Attributes:
+        workbook: The workbook the styles are registered in
+
+    """
+
+    def __init__(self, workbook: Workbook) -> None:
+        """Start with no registered styles."""
+        self.workbook = workbook
+        self._styles: dict[tuple, str] = {}
+        self._css_styles: dict[tuple, str | None] = {}
+        self._converter = CSSToExcelConverter()
+
+    def css(self, role: str, css: str) -> str | None:
+        """Return the name of the style of a table cell with this CSS, or None if it has none.
+
+        Converts the CSS the same way `Styler.to_excel` does, and wraps the cell's text.
+        CSS that Excel ignores, like column widths, doesn't make a separate style.
+
+        Args:
+            role: What the style is used for (ex. `"Header"`), the start of its name
+            css: The CSS of the cell
+
+        """
+        # Later declarations of a property win, and their order doesn't matter otherwise
+        declarations = frozenset({p.lower(): v for p, v in css_declarations(css)}.items())
+        css_key = (role, declarations)
+        if css_key in self._css_styles:
+            return self._css_styles[css_key]
+
+        xlstyle = self._converter(declarations) if declarations else {}
+        key = (role, repr(xlstyle))
+        if xlstyle and key not in self._styles:
+            style_kwargs = named_style_kwargs(xlstyle)
+            alignment = copy(style_kwargs.get("alignment", Alignment()))
+            alignment.wrapText = True  # type: ignore[reportAttributeAccessIssue]
+            style_kwargs["alignment"] = alignment
+            self._register(key, role, **style_kwargs)
+
+        self._css_styles[css_key] = self._styles.get(key)
+        return self._css_styles[css_key]
+
+    def font(self, role: str, fmt: FontStyle) -> str:
+        """Return the name of the style of a left-aligned line of text in the given font."""
+        key = (role, astuple(fmt))
+        if key not in self._styles:
+            self._register(
+                key,
+                role,
+                font=fmt.excel(),
+                alignment=Alignment(horizontal="left", vertical="center"),
+            )
+
+        return self._styles[key]
+
+    def _register(self, key: tuple, role: str, **style_kwargs: object) -> None:
+        """Add a new named style to the workbook."""
+        name = f"{role} {sum(k[0] == role for k in self._styles) + 1}"
+        style = NamedStyle(name=name, **style_kwargs)  # type: ignore[reportArgumentType]
+        self.workbook.add_named_style(style)
+        self._styles[key] = name
+        logger.debug("Registered Excel style %s", name)
+
+
+class ExcelSheetWriter:
+    """Appends styled rows to a write-only worksheet.
+
+    Attributes:
+        ws: The worksheet to write to, created by a write-only workbook. Column widths
+            and the sheet view must be set before the first row is written.
+        styles: The named styles of the worksheet's workbook
+        rows: Number of rows written so far
+        chunk_size: Number of table rows converted at once
+
+    """
+
+    def __init__(
+        self, ws: Worksheet, styles: ExcelStyles, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        """Start writing at the top of a worksheet."""
+        self.ws = ws
+        self.styles = styles
+        self.rows = 0
+        self.chunk_size = chunk_size
+
+    def append(self, values: Sequence[object], styles: Sequence[str | None]) -> None:
+        """Write a row of cells, each with the named style of the same index."""
+        cells = []
+        for value, style in zip(values, styles, strict=True):
+            cell = WriteOnlyCell(self.ws, value)  # type: ignore[reportArgumentType]
+            if style is not None:
+                # openpyxl finds a named style by name much faster than by comparing styles
+                cell.style = style  # type: ignore[reportAttributeAccessIssue]
+            cells.append(cell)
+
+        self.ws.append(cells)
+        self.rows += 1
+
+    def skip_row(self) -> None:
+        """Leave an empty row."""
+        self.ws.append([])
+        self.rows += 1
+
+    def write_section_header(self, text: str, fmt: FontStyle, end_col: int) -> None:
+        """Write a line of text across the first `end_col` columns."""
+        self.append([text], [self.styles.font("Section Header", fmt)])
+        self.ws.merged_cells.add(f"A{self.rows}:{get_column_letter(end_col)}{self.rows}")  # type: ignore[reportArgumentType]
+
+    def write_table(self, table: HTMLTableWriter) -> None:
+        """Write a table's column names and data, styled with the CSS it was given."""
+        self.append(
+            list(table.data.columns),
+            [self.styles.css("Header", css) for css in table.header_styles],
+        )
+
+        css_codes, unique_css = table.unique_cell_css()
+        body_styles = [self.styles.css("Body", css) for css in unique_css]
+        for start in range(0, len(table.data), self.chunk_size):
+            values = table.data.iloc[start : start + self.chunk_size].to_numpy(dtype=object)
+            for offset, row_values in enumerate(values):
+                row_styles = (
+                    [None] * len(row_values)
+                    if css_codes is None
+                    else [body_styles[code] for code in css_codes[start + offset]]
+                )
+                self.append(self.cell_values(row_values), row_styles)
+
+    @staticmethod
+    def cell_values(values: Iterable[object]) -> list[object]:
+        """Convert table values to cell values, leaving missing values empty like pandas."""
+        return [
+            "" if pd.isna(v) else v.item() if isinstance(v, np.generic) else v  # type: ignore[reportArgumentType]
+            for v in values
+        ]
@@ -0,0 +1,209 @@
+"""On-disk cache of parsed Vectorworks exports.
+
+Parsing a large Data Exchange XML file is the slowest part of ingestion, but the
+file is often unchanged between print runs. Parsed exports are stored as one
+uncompressed NumPy array per column (`.npz`), keyed by the size, mtime, and
+content hash of the source XML.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+import pandas as pd
+
+from lighting_paperwork.vectorworks_xml import VWExport
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the parsed representation changes to invalidate old entries
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+META_KEY = "meta"
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory, respecting XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "lighting-paperwork"
+
+
+@dataclass
+class CachedExport:
+    """The parsed result of a VWExport.
+
+    Attributes:
+        df: The DataFrame from :func:`VWExport.export_df`
+        field_mapping: Mapping of XML tags to "pretty" descriptions
+        export_time: Timestamp of the XML export
+        vw_version: VW version that generated the XML export
+        vw_build: VW build that generated the XML export
+
+    """
+
+    df: pd.DataFrame
+    field_mapping: dict[str, str]
+    export_time: str | None
+    vw_version: str | None
+    vw_build: str | None
+
+    @classmethod
+    def from_vw_export(cls, vw_export: VWExport) -> Self:
+        """Export a parsed VWExport into a cacheable result."""
+        df = vw_export.export_df()
+        return cls(
+            df=df,
+            field_mapping=dict(vw_export.field_mapping),
+            export_time=vw_export.export_time,
+            vw_version=vw_export.vw_version,
+            vw_build=vw_export.vw_build,
+        )
+
+
+class ExportCache:
+    """Size-bounded on-disk cache of parsed exports.
+
+    Entries are evicted least-recently-used first once the cache directory grows
+        past `max_bytes`. A cache hit refreshes the entry's mtime.
+
+    Attributes:
+        cache_dir: Directory that cache entries are stored in
+        max_bytes: Maximum total size of all cache entries
+
+    """
+
+    def __init__(self, cache_dir: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Set up the cache location and size limit."""
+        self.cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(filename: str | Path) -> str:
+        """Generate a cache key from the size, mtime, and content hash of a file."""
+        path = Path(filename)
+        stat = path.stat()
+        with path.open("rb") as f:
+            content_hash = hashlib.file_digest(f, "sha256").hexdigest()
+
+        return hashlib.sha256(
+            f"{CACHE_FORMAT_VERSION}:{stat.st_size}:{stat.st_mtime_ns}:{content_hash}".encode()
+        ).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        """Return the location of a cache entry."""
+        return self.cache_dir / f"{key}.npz"
+
+    def load(self, key: str) -> CachedExport | None:
+        """Load a cached export by its :func:`key`, or None on a cache miss."""
+        path = self.entry_path(key)
+        if not path.is_file():
+            logger.debug("No cached export for key %s", key)
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data[META_KEY]))
+                df = pd.DataFrame(
+                    {name: data[f"col_{idx}"] for idx, name in enumerate(meta["columns"])},
+                    columns=meta["columns"],
+                )
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            logger.warning("Discarding unreadable cache entry %s", path)
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark as recently used for eviction
+        path.touch()
+        logger.debug("Loaded cached export from %s", path)
+
+        return CachedExport(
+            df=df,
+            field_mapping=meta["field_mapping"],
+            export_time=meta["export_time"],
+            vw_version=meta["vw_version"],
+            vw_build=meta["vw_build"],
+        )
+
+    def store(self, key: str, export: CachedExport) -> Path:
+        """Save a parsed export to the cache, evicting old entries if needed."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.entry_path(key)
+
+        meta = {
+            "columns": [str(c) for c in export.df.columns],
+            "field_mapping": export.field_mapping,
+            "export_time": export.export_time,
+            "vw_version": export.vw_version,
+            "vw_build": export.vw_build,
+        }
+        arrays = {
+            f"col_{idx}": export.df[col].to_numpy(dtype=str)
+            for idx, col in enumerate(export.df.columns)
+        }
+        arrays[META_KEY] = np.array(json.dumps(meta))
+
+        # Write atomically so a concurrent run never sees a partial entry
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)  # type: ignore[reportArgumentType]
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        logger.debug("Cached export at %s", path)
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        """Remove least-recently-used entries until the cache fits in `max_bytes`."""
+        entries = [(p, p.stat()) for p in self.cache_dir.glob("*.npz")]
+        entries.sort(key=lambda e: e[1].st_mtime_ns)
+        total = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            logger.debug("Evicting cached export %s", path)
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        for path in self.cache_dir.glob("*.npz"):
+            path.unlink(missing_ok=True)
+
+
+def load_vw_export(filename: str, cache: ExportCache | None = None) -> CachedExport:
+    """Parse a VW XML export, reusing a cached parse when the file is unchanged.
+
+    Args:
+        filename: A valid filename to a XML export
+        cache: The cache to use, or None to always parse the XML
+
+    """
+    if cache is None:
+        return CachedExport.from_vw_export(VWExport(filename))
+
+    # Key before parsing so an export rewritten mid-parse isn't cached under the new key
+    key = cache.key(filename)
+    cached = cache.load(key)
+    if cached is not None:
+        logger.info("Using cached parse of %s", filename)
+        return cached
+
+    export = CachedExport.from_vw_export(VWExport(filename))
+    try:
+        cache.store(key, export)
+    except OSError:
+        logger.warning("Unable to write export cache to %s", cache.cache_dir)
+
+    return export
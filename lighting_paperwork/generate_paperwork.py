@@ -2,22 +2,38 @@
 
 import argparse
 import logging
+import time
 from importlib.metadata import version
 from pathlib import Path
+from xml.etree import ElementTree as ET
 
 import pandas as pd
 from rich.logging import RichHandler
 
 from lighting_paperwork.channel_hookup import ChannelHookup
 from lighting_paperwork.color_cut_list import ColorCutList
+from lighting_paperwork.export_cache import ExportCache, default_cache_dir, load_vw_export
 from lighting_paperwork.gobo_pull import GoboPullList
-from lighting_paperwork.helpers import ShowData
+from lighting_paperwork.helpers import ShowData, parse_cache_info
 from lighting_paperwork.instrument_schedule import InstrumentSchedule
-from lighting_paperwork.paperwork_exporters import ExportExcel, ExportHTML, ExportPDF
-from lighting_paperwork.vectorworks_xml import VWExport
+from lighting_paperwork.paperwork import PaperworkGenerator
+from lighting_paperwork.paperwork_exporters import (
+    ExportExcel,
+    ExportHTML,
+    ExportPDF,
+    PaperworkExporter,
+)
+from lighting_paperwork.show_model import ShowModel
+from lighting_paperwork.styler_templates import styler_templates
+from lighting_paperwork.vectorworks_xml import IncrementalVWExport
 
 logger = logging.getLogger(__name__)
 
+# Seconds between checks for a changed export in watch mode
+WATCH_POLL_INTERVAL = 0.25
+# Seconds an export must go unchanged before it's considered completely written
+WATCH_DEBOUNCE = 0.5
+
 
 def is_file(path: str) -> str:
     """Determine if a path is a file or not."""
@@ -37,6 +53,46 @@ def main(argv: list[str] | None = None) -> None:
     parser.add_argument("--ld", help="Lighting designer initials")
     parser.add_argument("--rev", help="Revision string (ex. 'Rev. A')")
     parser.add_argument("--version", action="version", version=version("lighting-paperwork"))
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse the XML and recompile templates instead of reusing cached copies.",
+    )
+    parser.add_argument(
+        "--css-classes",
+        action="store_true",
+        help="Style HTML/PDF tables with a shared stylesheet instead of per-cell styles. "
+        "Produces much smaller files for large shows.",
+    )
+    parser.add_argument(
+        "--stream-html",
+        action="store_true",
+        help="Write HTML/PDF tables directly instead of through pandas' Styler. "
+        "Much faster and uses less memory for large shows.",
+    )
+    parser.add_argument(
+        "--stream-excel",
+        action="store_true",
+        help="Write Excel sheets row by row with shared cell styles. "
+        "Much faster and uses less memory for large shows.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Lay out PDF reports in this many processes at once (default 1).",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        help="With --jobs, also split tables longer than this many rows into chunks "
+        "that are laid out in parallel.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and regenerate paperwork whenever the file changes.",
+    )
     parser.add_argument(
         "-log",
         "--loglevel",
@@ -80,38 +136,232 @@ def main(argv: list[str] | None = None) -> None:
     )
 
     show_info = ShowData(args.show, args.ld, args.rev)
+    if not args.no_cache:
+        try:
+            styler_templates.enable_bytecode_cache(default_cache_dir() / "templates")
+        except OSError:
+            logger.warning("Unable to cache compiled templates in %s", default_cache_dir())
 
-    if "csv" in args.file:
-        # Converter is to suppress the warning when I set addr=0 to empty string
-        vw_export = pd.read_csv(args.file, sep="\t", header=0, converters={"Absolute Address": str})
-
-        # Clear VW's default "None" character
-        vw_export = vw_export.replace("-", "")
+    if args.watch:
+        watch(
+            args.file,
+            args.output_type,
+            show_info,
+            css_classes=args.css_classes,
+            stream_html=args.stream_html,
+            stream_excel=args.stream_excel,
+            jobs=args.jobs,
+            chunk_rows=args.chunk_rows,
+        )
+        return
 
+    if "csv" in args.file:
+        vw_export = read_csv_export(args.file)
     elif "xml" in args.file:
-        vw_export = VWExport(args.file).export_df()
-
+        cache = None if args.no_cache else ExportCache()
+        vw_export = load_vw_export(args.file, cache).df
     else:
         raise RuntimeError("Only supports csv and xml")
 
-    paperwork_list = [
-        ChannelHookup(vw_export, show_info),
-        InstrumentSchedule(vw_export, show_info),
-        ColorCutList(vw_export, show_info),
-        GoboPullList(vw_export, show_info),
+    paperwork = make_paperwork(
+        vw_export, show_info, css_classes=args.css_classes, stream_html=args.stream_html
+    )
+    publish(
+        make_exporter(
+            args.output_type,
+            show_info,
+            paperwork,
+            jobs=args.jobs,
+            chunk_rows=args.chunk_rows,
+            stream_excel=args.stream_excel,
+        )
+    )
+    logger.debug("Parser cache statistics: %s", parse_cache_info())
+
+
+def read_csv_export(filename: str) -> pd.DataFrame:
+    """Read a Vectorworks lighting device CSV export."""
+    # Converter is to suppress the warning when I set addr=0 to empty string
+    vw_export = pd.read_csv(filename, sep="\t", header=0, converters={"Absolute Address": str})
+
+    # Clear VW's default "None" character
+    return vw_export.replace("-", "")
+
+
+def make_paperwork(
+    vw_export: pd.DataFrame,
+    show_info: ShowData,
+    *,
+    css_classes: bool = False,
+    stream_html: bool = False,
+) -> list[PaperworkGenerator]:
+    """Create every paperwork generator for an export.
+
+    The generators share one :class:`ShowModel`, so columns derived from the export
+        are only computed once.
+    """
+    model = ShowModel(vw_export)
+    return [
+        ChannelHookup(model, show_info, css_classes=css_classes, stream_html=stream_html),
+        InstrumentSchedule(model, show_info, css_classes=css_classes, stream_html=stream_html),
+        ColorCutList(model, show_info, css_classes=css_classes, stream_html=stream_html),
+        GoboPullList(model, show_info, css_classes=css_classes, stream_html=stream_html),
     ]
 
-    if args.output_type == "html":
-        output_path = ExportHTML(show_info.generate_slug(), paperwork_list).make()
-        logger.info("HTML published to %s", output_path)
-    elif args.output_type == "pdf":
-        output_path = ExportPDF(show_info.generate_slug(), paperwork_list).make()
+
+def make_exporter(  # noqa: PLR0913
+    output_type: str,
+    show_info: ShowData,
+    paperwork: list[PaperworkGenerator],
+    jobs: int = 1,
+    chunk_rows: int | None = None,
+    *,
+    stream_excel: bool = False,
+) -> PaperworkExporter:
+    """Create the exporter for an output type.
+
+    `jobs` and `chunk_rows` control how PDF reports are laid out, see :class:`ExportPDF`.
+    `stream_excel` selects the write-only Excel backend, see :class:`ExportExcel`.
+    """
+    if output_type == "html":
+        return ExportHTML(show_info.generate_slug(), paperwork)
+    if output_type == "pdf":
+        return ExportPDF(show_info.generate_slug(), paperwork, jobs=jobs, chunk_rows=chunk_rows)
+    if output_type == "excel":
+        return ExportExcel(show_info.generate_slug(), paperwork, stream=stream_excel)
+
+    raise ValueError(f"Unknown output type {output_type}")
+
+
+def publish(exporter: PaperworkExporter) -> Path:
+    """Generate and save paperwork from an exporter."""
+    output_path = exporter.make()
+    if isinstance(exporter, ExportPDF):
         logger.info("PDF published to %s", output_path)
-    elif args.output_type == "excel":
-        output_path = ExportExcel(show_info.generate_slug(), paperwork_list).make()
-        logger.info("Excel workbook published to %s", output_path)
+    elif isinstance(exporter, ExportHTML):
+        logger.info("HTML published to %s", output_path)
     else:
-        raise ValueError(f"Unknown output type {args.output_type}")
+        logger.info("Excel workbook published to %s", output_path)
+
+    return output_path
+
+
+def changed_fields(old: pd.DataFrame, new: pd.DataFrame) -> set[str]:
+    """Determine which columns differ between two exports.
+
+    Any change to the rows themselves (added, removed, or reordered instruments)
+        marks every column as changed.
+    """
+    all_fields = {str(c) for c in old.columns} | {str(c) for c in new.columns}
+    if old.shape != new.shape or not old.columns.equals(new.columns):
+        return all_fields
+    if not old.index.equals(new.index):
+        return all_fields
+    if "Node Tag" in new.columns and not old["Node Tag"].equals(new["Node Tag"]):
+        return all_fields
+
+    same = (old == new) | (old.isna() & new.isna())
+    return {str(c) for c in new.columns[~same.all().to_numpy()]}
+
+
+def file_signature(path: str) -> tuple[int, int] | None:
+    """Return a file's (mtime, size), or None if it doesn't currently exist."""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def wait_for_change(
+    path: str,
+    last_signature: tuple[int, int] | None,
+    poll_interval: float = WATCH_POLL_INTERVAL,
+    debounce: float = WATCH_DEBOUNCE,
+) -> tuple[int, int]:
+    """Block until a file changes and then stays unchanged for `debounce` seconds.
+
+    Vectorworks may write the export in several bursts, so this waits for the writes
+        to settle before returning the file's new signature.
+    """
+    signature = file_signature(path)
+    while signature == last_signature:
+        time.sleep(poll_interval)
+        signature = file_signature(path)
+
+    while True:
+        time.sleep(debounce)
+        settled = file_signature(path)
+        if settled is not None and settled == signature:
+            return settled
+        signature = settled
+
+
+def watch(  # noqa: PLR0913
+    filename: str,
+    output_type: str,
+    show_info: ShowData,
+    *,
+    css_classes: bool = False,
+    stream_html: bool = False,
+    stream_excel: bool = False,
+    jobs: int = 1,
+    chunk_rows: int | None = None,
+) -> None:
+    """Regenerate paperwork whenever the export changes, until interrupted.
+
+    Parsed data and imported modules stay warm between updates. XML exports are
+        refreshed incrementally, and only paperwork that reads a changed column is
+        regenerated.
+    """
+    incremental = IncrementalVWExport(filename) if "xml" in filename else None
+
+    def read_export() -> pd.DataFrame:
+        return read_csv_export(filename) if incremental is None else incremental.refresh()
+
+    signature = file_signature(filename)
+    vw_export = read_csv_export(filename) if incremental is None else incremental.df
+    exporter = make_exporter(
+        output_type,
+        show_info,
+        make_paperwork(vw_export, show_info, css_classes=css_classes, stream_html=stream_html),
+        jobs=jobs,
+        chunk_rows=chunk_rows,
+        stream_excel=stream_excel,
+    )
+    publish(exporter)
+
+    logger.info("Watching %s for changes (Ctrl-C to stop)", filename)
+    try:
+        while True:
+            signature = wait_for_change(filename, signature)
+            try:
+                new_export = read_export()
+            except (ET.ParseError, RuntimeError, ValueError, OSError):
+                logger.exception("Unable to read %s, waiting for the next change", filename)
+                continue
+
+            stale_fields = changed_fields(vw_export, new_export)
+            if not stale_fields:
+                logger.info("No paperwork changes in %s", filename)
+                continue
+
+            vw_export = new_export
+            new_paperwork = make_paperwork(
+                vw_export, show_info, css_classes=css_classes, stream_html=stream_html
+            )
+            exporter.paperwork = [
+                new if stale_fields.intersection(old.filter_fields) else old
+                for old, new in zip(exporter.paperwork, new_paperwork, strict=True)
+            ]
+            logger.info(
+                "Regenerating %s",
+                ", ".join(p.display_name for p in new_paperwork if p in exporter.paperwork),
+            )
+            publish(exporter)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching %s", filename)
 
 
 if __name__ == "__main__":
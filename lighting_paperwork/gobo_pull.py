@@ -1,10 +1,11 @@
 """Generator for a gobo pull list."""
 
 import logging
-from typing import Self, Unpack, override
+from typing import Unpack, override
 
 import numpy as np
 import pandas as pd
+from pandas.io.formats.style_render import CSSDict
 
 from lighting_paperwork.paperwork import PaperworkGenerator, StyleDataParams, StyleFieldParams
 
@@ -17,12 +18,13 @@ class GoboPullList(PaperworkGenerator):
     col_widths = (80, 20)
     page_width = 40
     display_name = "Gobo Pull List"
+    filter_fields = ("Gobo 1", "Gobo 2")
 
     @override
-    def generate_df(self) -> Self:
-        filter_fields = ["Gobo 1", "Gobo 2"]
+    def generate_base_df(self) -> pd.DataFrame:
+        filter_fields = list(self.filter_fields)
         self.verify_filter_fields(filter_fields)
-        chan_fields = pd.DataFrame(self.vw_export[filter_fields], columns=filter_fields)
+        chan_fields = self.model.project(filter_fields)
         gobo_list = []
 
         for _, row in chan_fields.iterrows():
@@ -33,33 +35,40 @@ class GoboPullList(PaperworkGenerator):
 
         gobo_name, gobo_count = np.unique(gobo_list, return_counts=True)
 
-        self.df = pd.DataFrame(
-            zip(gobo_name, gobo_count, strict=True), columns=["Gobo Name", "Count"]
-        )
+        return pd.DataFrame(zip(gobo_name, gobo_count, strict=True), columns=["Gobo Name", "Count"])
 
-        return self
+    @staticmethod
+    def column_css(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[str]:
+        """Return the font, width, and alignment CSS of each column."""
+        return [
+            f"{kwargs['body_style'].to_css()}; vertical-align: middle; "
+            f"width: {kwargs['col_width'][idx]}%; "
+            "text-align: left; "
+            for idx, _ in enumerate(columns)
+        ]
 
     @override
     @staticmethod
     def style_data(df: pd.DataFrame, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
         border_style = f"{kwargs['border_weight']}px solid black"
-        style_df = pd.DataFrame().reindex_like(df).astype(str)
-
-        for index, _ in df.iterrows():
-            style_df.loc[index, :] = ""  # type: ignore[reportCallIssue, reportArgumentType]
-            style_df.loc[index, :] += f"border-bottom: {border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
 
         # Set font based on column
-        for col_name in style_df:
-            width_idx = style_df.columns.get_loc(col_name)
-            style_df[col_name] += (
-                f"{kwargs['body_style'].to_css()}; vertical-align: middle; "
-                f"width: {kwargs['col_width'][width_idx]}%; "  # type: ignore[reportCallIssue, reportArgumentType]
-            )
+        col_css = GoboPullList.column_css(df.columns, **kwargs)
 
-            style_df[col_name] += "text-align: left; "
+        return PaperworkGenerator.broadcast_style(df, f"border-bottom: {border_style}; ", col_css)
 
-        return style_df
+    @override
+    @staticmethod
+    def style_classes(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
+        return PaperworkGenerator.broadcast_style(df, "", [""] * len(df.columns))
+
+    @override
+    @staticmethod
+    def class_styles(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[CSSDict]:
+        return [
+            {"selector": "td", "props": f"border-bottom: {kwargs['border_weight']}px solid black;"},
+            *PaperworkGenerator.column_class_styles(GoboPullList.column_css(columns, **kwargs)),
+        ]
 
     @override
     @staticmethod
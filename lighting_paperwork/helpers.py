@@ -5,12 +5,30 @@ import logging
 import re
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Self
+from functools import lru_cache
+from typing import Any, Self
 
+import numpy as np
+import numpy.typing as npt
 import openpyxl.styles as openpyxl_styles
+import pandas as pd
+from natsort import natsort_keygen
 
 logger = logging.getLogger(__name__)
 
+# Parsers below are memoized: a rig has thousands of units but only a handful of
+# distinct fixture types, gels, and frame sizes.
+PARSE_CACHE_SIZE = 1024
+
+NON_NUMERIC_REGEX = re.compile(r"[^\d\.\-]")
+GEL_COMPANY_REGEXES = (
+    (re.compile(r"^AP\d+$", re.IGNORECASE), "Apollo"),
+    (re.compile(r"^G\d+$", re.IGNORECASE), "GAM"),
+    (re.compile(r"^L\d+$", re.IGNORECASE), "Lee"),
+    (re.compile(r"^R\d+$", re.IGNORECASE), "Rosco"),
+)
+ROSCO_EXTENDED_REGEX = re.compile(r"^R3\d\d$", re.IGNORECASE)
+
 
 @dataclass
 class ShowData:
@@ -53,22 +71,7 @@ class InstrumentPower:
             input_string: A string or number that somewhat resembles a valid power.
 
         """
-        if input_string is None:
-            self.power: Decimal = Decimal(0)
-        elif isinstance(input_string, (float, int)):
-            self.power: Decimal = Decimal(input_string)
-        elif isinstance(input_string, str):
-            if input_string.strip() == "":
-                self.power: Decimal = Decimal(0)
-            else:
-                # Remove non-numeric/decimal values
-                self.power: Decimal = Decimal(re.sub(r"[^\d\.\-]", "", input_string))
-                if "k" in input_string:
-                    self.power *= 1000
-                if "M" in input_string:
-                    self.power *= 1000 * 1000
-
-        self.power = self.power.normalize()
+        self.power: Decimal = _parse_power(input_string)
         if self.power < 0:
             raise ValueError(f"Light sucker detected ({self.power} < 0W)")
 
@@ -85,6 +88,26 @@ class InstrumentPower:
         return f"{powerval}W"
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_power(input_string: str | float | None) -> Decimal:
+    """Parse something that somewhat resembles a power into a normalized Decimal."""
+    if input_string is None:
+        power = Decimal(0)
+    elif isinstance(input_string, (float, int)):
+        power = Decimal(input_string)
+    elif input_string.strip() == "":
+        power = Decimal(0)
+    else:
+        # Remove non-numeric/decimal values
+        power = Decimal(NON_NUMERIC_REGEX.sub("", input_string))
+        if "k" in input_string:
+            power *= 1000
+        if "M" in input_string:
+            power *= 1000 * 1000
+
+    return power.normalize()
+
+
 @dataclass
 class DMXAddress:
     """Dataclass for DMX address and formatting.
@@ -160,6 +183,32 @@ class DMXAddress:
             return f"{self.absolute_address}"
         return self.format_slash()
 
+    @classmethod
+    def format_slash_conditional_array(cls, absolute_addresses: npt.ArrayLike) -> np.ndarray:
+        """Format many absolute addresses at once, like :func:`format_slash_conditional`.
+
+        Args:
+            absolute_addresses: Absolute DMX addresses, 1-indexed.
+
+        Returns:
+            An array of formatted address strings.
+
+        Raises:
+            ValueError: An address is less than 1.
+
+        """
+        addresses = np.asarray(absolute_addresses, dtype=np.int64)
+        if (addresses <= 0).any():
+            raise ValueError(
+                f"Absolute address cannot be less than 1 (got {addresses[addresses <= 0][0]})"
+            )
+
+        universe, rel_address = np.divmod(addresses - 1, 512)
+        slashed = np.char.add(
+            np.char.add((universe + 1).astype(str), "/"), (rel_address + 1).astype(str)
+        )
+        return np.where(addresses < 513, addresses.astype(str), slashed)
+
 
 @dataclass
 class Gel:
@@ -188,29 +237,11 @@ class Gel:
             gel: name code for a gel (ex. R355 or L201).
 
         """
-        gel = gel.strip()
-        if re.search(r"^AP\d+$", gel, re.IGNORECASE):
-            company = "Apollo"
-        elif re.search(r"^G\d+$", gel, re.IGNORECASE):
-            company = "GAM"
-        elif re.search(r"^L\d+$", gel, re.IGNORECASE):
-            company = "Lee"
-        elif re.search(r"^R\d+$", gel, re.IGNORECASE):
-            company = "Rosco"
-        else:
-            logger.warning("Unknown company prefix for gel %s", gel)
-            return cls(gel, gel, "")
+        name, name_sort, company = _parse_gel_name(gel.strip())
+        if company == "":
+            logger.warning("Unknown company prefix for gel %s", name)
 
-        # consistent formatting for known gels
-        gel = gel.upper()
-
-        if company == "Rosco" and re.match(r"^R3\d\d$", gel, re.IGNORECASE):
-            # Rosco extended gel, this is basically a .5 gel for sorting purposes
-            gelsort = "R" + gel[2:] + ".3"
-        else:
-            gelsort = gel
-
-        return cls(gel, gelsort, company)
+        return cls(name, name_sort, company)
 
     @classmethod
     def parse_gel(cls, gel: str) -> list[Self]:
@@ -228,20 +259,46 @@ class Gel:
         if gel is None or gel == "":
             return [cls("", "", "")]
 
-        gel_list = []
-        # Only supports + as a separator for now
-        for i in gel.split("+"):
-            gel_name = i.strip()
-            if len(gel_name.split("x")) > 1:
-                # Repeat gel situation (ex. L201x2)
-                g = gel_name.split("x")
-                gel_list.extend(cls._parse_name(g[0]) for x in range(int(g[1])))
-            else:
-                gel_list.append(cls._parse_name(gel_name))
+        return [cls._parse_name(gel_name) for gel_name in _split_gel(gel)]
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_gel_name(gel: str) -> tuple[str, str, str]:
+    """Return the name, sort name, and company of a single gel name code."""
+    company = next((c for regex, c in GEL_COMPANY_REGEXES if regex.search(gel)), None)
+    if company is None:
+        return gel, gel, ""
 
-        return gel_list
+    # consistent formatting for known gels
+    gel = gel.upper()
 
+    if company == "Rosco" and ROSCO_EXTENDED_REGEX.match(gel):
+        # Rosco extended gel, this is basically a .5 gel for sorting purposes
+        gelsort = "R" + gel[2:] + ".3"
+    else:
+        gelsort = gel
 
+    return gel, gelsort, company
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _split_gel(gel: str) -> tuple[str, ...]:
+    """Split a complex gel string into one name code per physical gel."""
+    gel_names: list[str] = []
+    # Only supports + as a separator for now
+    for i in gel.split("+"):
+        gel_name = i.strip()
+        if len(gel_name.split("x")) > 1:
+            # Repeat gel situation (ex. L201x2)
+            g = gel_name.split("x")
+            gel_names.extend(g[0] for x in range(int(g[1])))
+        else:
+            gel_names.append(gel_name)
+
+    return tuple(gel_names)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_frame_size(frame_str: str) -> str:
     """Parse a frame size.
 
@@ -292,6 +349,59 @@ def parse_frame_size(frame_str: str) -> str:
     return f'{frame_size}"'
 
 
+def parse_cache_info() -> dict[str, Any]:
+    """Return the hit/miss statistics of each memoized parser."""
+    return {
+        "power": _parse_power.cache_info(),
+        "gel": _split_gel.cache_info(),
+        "gel_name": _parse_gel_name.cache_info(),
+        "frame_size": parse_frame_size.cache_info(),
+    }
+
+
+def clear_parse_caches() -> None:
+    """Empty the cache of each memoized parser."""
+    for parser in (_parse_power, _split_gel, _parse_gel_name, parse_frame_size):
+        parser.cache_clear()
+
+
+def natsort_rank(values: pd.Series | npt.ArrayLike) -> np.ndarray:
+    """Rank values in natural sort order, so they can be sorted as plain integers.
+
+    The natsort key is only built once per distinct value. Values with equal keys
+        (ex. `1` and `01`) share a rank, so sorting by rank keeps them in their order.
+
+    Args:
+        values: The values to rank
+
+    Returns:
+        An integer rank for each value.
+
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)  # type: ignore[reportArgumentType]
+    natsort_key = natsort_keygen()
+    unique_keys = [natsort_key(i) for i in uniques]
+
+    unique_ranks = np.empty(len(unique_keys), dtype=np.intp)
+    rank = -1
+    prev_key = None
+    for i in sorted(range(len(unique_keys)), key=unique_keys.__getitem__):
+        if rank < 0 or unique_keys[i] != prev_key:
+            rank += 1
+            prev_key = unique_keys[i]
+        unique_ranks[i] = rank
+
+    return unique_ranks[codes]
+
+
+def natsort_order(*columns: pd.Series | npt.ArrayLike) -> np.ndarray:
+    """Return the indices that naturally sort by each column in turn, see :func:`natsort_rank`.
+
+    Like `df.sort_values(by=columns, key=natsort_keygen())`, the sort is stable.
+    """
+    return np.lexsort([natsort_rank(col) for col in reversed(columns)])
+
+
 @dataclass
 class FontStyle:
     """Dataclass for storing CSS font style information.
@@ -0,0 +1,222 @@
+"""Streaming HTML table writer.
+
+Rendering a table through pandas' Styler builds a context dictionary for every cell
+before any HTML is produced. For long paperwork this dominates both time and memory,
+so :class:`HTMLTableWriter` writes the same table markup straight from the DataFrame
+to a text sink, a chunk of rows at a time.
+"""
+
+import io
+import logging
+import uuid as uuid_lib
+from collections.abc import Callable, Iterable
+from typing import Any, Protocol, Self
+
+import numpy as np
+import pandas as pd
+from pandas.io.formats.style_render import CSSDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class TextSink(Protocol):
+    """Anything HTML can be written to, such as an open text file or `io.StringIO`."""
+
+    def write(self, s: str, /) -> int:
+        """Write a string."""
+        ...
+
+    def writelines(self, lines: Iterable[str], /) -> None:
+        """Write each string from an iterable."""
+        ...
+
+
+def css_declarations(props: str | list[tuple[str, str | float]]) -> list[tuple[str, str]]:
+    """Split a CSS string (ex. `"a: b; c: d"`) into (property, value) pairs."""
+    if not isinstance(props, str):
+        return [(p, str(v)) for p, v in props]
+
+    declarations = []
+    for declaration in props.split(";"):
+        if declaration.strip() == "":
+            continue
+        prop, _, val = declaration.partition(":")
+        declarations.append((prop.strip(), val.strip()))
+
+    return declarations
+
+
+def css_rule(selector: str, props: str | list[tuple[str, str | float]]) -> str:
+    """Format a CSS rule the same way Styler does."""
+    body = "".join(f"  {prop}: {val};\n" for prop, val in css_declarations(props))
+    return f"{selector} {{\n{body}}}\n"
+
+
+class HTMLTableWriter:
+    """Writes a paperwork table as HTML without a pandas Styler.
+
+    Supports the subset of the Styler API used by the paperwork generators, and writes
+        markup equivalent to `header_footer.tpl`. Cells with identical CSS share one
+        class instead of each getting their own id.
+
+    Attributes:
+        data: The DataFrame to render
+        uuid: Unique id of the table, used to scope its CSS
+        chunk_size: Number of rows rendered per write to the sink
+
+    """
+
+    def __init__(self, data: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Set up an unstyled table."""
+        self.data = data
+        self.uuid = uuid_lib.uuid4().hex[:5]
+        self.chunk_size = chunk_size
+        self.table_attributes = ""
+        self.table_styles: list[CSSDict] = []
+        self.header_styles: list[str] = ["" for _ in data.columns]
+        self._cell_css: np.ndarray | None = None
+        self._cell_classes: np.ndarray | None = None
+        self._tr_classes: list[str] | None = None
+
+    def apply(
+        self,
+        func: Callable[..., pd.DataFrame],
+        axis: None = None,  # noqa: ARG002
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Self:
+        """Style cells with a function that returns a DataFrame of CSS strings."""
+        self._cell_css = func(self.data, **kwargs).to_numpy(dtype=object)
+        return self
+
+    def apply_index(
+        self,
+        func: Callable[..., list[str]],
+        axis: int = 1,  # noqa: ARG002
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Self:
+        """Style the column headers with a function that returns a CSS string per column."""
+        self.header_styles = list(func(self.data.columns, **kwargs))
+        return self
+
+    def set_td_classes(self, classes: pd.DataFrame) -> Self:
+        """Add CSS classes to the data cells."""
+        self._cell_classes = classes.to_numpy(dtype=object)
+        return self
+
+    def set_tr_classes(self, classes: list[str]) -> Self:
+        """Add CSS classes to the rows of the table body, one string per row."""
+        self._tr_classes = classes
+        return self
+
+    def set_table_styles(self, table_styles: list[CSSDict], overwrite: bool = True) -> Self:  # noqa: FBT001, FBT002
+        """Add CSS rules scoped to this table."""
+        self.table_styles = [*([] if overwrite else self.table_styles), *table_styles]
+        return self
+
+    def set_table_attributes(self, attributes: str) -> Self:
+        """Set the attributes of the `<table>` element."""
+        self.table_attributes = attributes
+        return self
+
+    def hide(self) -> Self:
+        """Hide the index, which is never rendered."""
+        return self
+
+    def to_html(self, **kwargs: str) -> str:
+        """Render the table to a string, see :func:`write`."""
+        html = io.StringIO()
+        self.write(html, **kwargs)
+        return html.getvalue()
+
+    def write(
+        self,
+        sink: TextSink,
+        generated_header: str = "",
+        generated_footer: str = "",
+        generated_page_style: str = "",
+    ) -> None:
+        """Write the table, its styles, and its running header/footer to `sink`."""
+        css_classes = self.unique_cell_css()
+        sink.write(self._style_html(css_classes[1]))
+        sink.write(f"\n{generated_page_style}\n")
+
+        table_attributes = f" {self.table_attributes}" if self.table_attributes else ""
+        sink.write(f'<table id="T_{self.uuid}"{table_attributes}>\n  <thead>\n')
+        sink.write(
+            '<tr class="generatedMarginals">\n'
+            f"    <th colspan=42>\n        {generated_header}\n    </th>\n</tr>\n"
+        )
+        sink.write(self._column_header_html())
+        sink.write("  </thead>\n  <tbody>\n")
+
+        sink.writelines(
+            self._rows_html(start, start + self.chunk_size, css_classes[0])
+            for start in range(0, len(self.data), self.chunk_size)
+        )
+
+        sink.write(
+            "  </tbody>\n"
+            '<tfoot>\n    <tr class="generatedMarginals">\n'
+            f"        <th colspan=42>\n            {generated_footer}\n        </th>\n"
+            "    </tr>\n</tfoot>\n</table>\n"
+        )
+
+    def unique_cell_css(self) -> tuple[np.ndarray | None, list[str]]:
+        """Deduplicate the per-cell CSS.
+
+        Returns:
+            The index of each cell's CSS in the list of distinct CSS strings (or None if
+                the cells aren't styled), and that list.
+
+        """
+        if self._cell_css is None:
+            return None, []
+
+        codes, uniques = pd.factorize(self._cell_css.ravel())
+        return codes.reshape(self._cell_css.shape), [str(css) for css in uniques]
+
+    def _style_html(self, unique_css: list[str]) -> str:
+        """Render the `<style>` block for the table."""
+        rules = [css_rule(f"#T_{self.uuid} {s['selector']}", s["props"]) for s in self.table_styles]
+        rules.extend(
+            css_rule(f"#T_{self.uuid} td.s{idx}", css)
+            for idx, css in enumerate(unique_css)
+            if css_declarations(css)
+        )
+        rules.extend(
+            css_rule(f"#T_{self.uuid}_level0_col{idx}", css)
+            for idx, css in enumerate(self.header_styles)
+            if css_declarations(css)
+        )
+        return '<style type="text/css">\n' + "".join(rules) + "</style>\n"
+
+    def _column_header_html(self) -> str:
+        """Render the row of column headers."""
+        cells = "".join(
+            f'      <th id="T_{self.uuid}_level0_col{idx}" '
+            f'class="col_heading level0 col{idx}" >{name}</th>\n'
+            for idx, name in enumerate(self.data.columns)
+        )
+        return f"    <tr>\n{cells}    </tr>\n"
+
+    def _rows_html(self, start: int, stop: int, css_codes: np.ndarray | None) -> str:
+        """Render the data rows from `start` to `stop`."""
+        values = self.data.iloc[start:stop].to_numpy(dtype=object)
+        rows = []
+        for offset, row_values in enumerate(values):
+            row = start + offset
+            cells = []
+            for col, value in enumerate(row_values):
+                cls = f"data row{row} col{col}"
+                if css_codes is not None:
+                    cls += f" s{css_codes[row, col]}"
+                if self._cell_classes is not None and self._cell_classes[row, col]:
+                    cls += f" {self._cell_classes[row, col]}"
+                cells.append(f'      <td class="{cls}" >{value}</td>\n')
+            tr_class = self._tr_classes[row] if self._tr_classes is not None else ""
+            tr = f'    <tr class="{tr_class}">\n' if tr_class else "    <tr>\n"
+            rows.append(tr + "".join(cells) + "    </tr>\n")
+
+        return "".join(rows)
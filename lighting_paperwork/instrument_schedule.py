@@ -2,24 +2,62 @@
 
 import logging
 import re
-from copy import copy
-from pathlib import Path
-from typing import Self, Unpack, override
+from collections.abc import Callable, Iterator
+from functools import cache
+from typing import Unpack, override
 
 import numpy as np
-import openpyxl
 import pandas as pd
-from natsort import natsort_keygen, natsorted
-from pandas.io.formats.style import Styler
+from natsort import natsort_keygen
+from openpyxl.workbook.workbook import Workbook
+from pandas.io.formats.style_render import CSSDict
 
 from lighting_paperwork import excel_formatter
-from lighting_paperwork.helpers import FontStyle, StyledContent, excel_quirks
-from lighting_paperwork.paperwork import PaperworkGenerator, StyleDataParams, StyleFieldParams
+from lighting_paperwork.excel_writer import ExcelSheetWriter, ExcelStyles
+from lighting_paperwork.helpers import (
+    FontStyle,
+    StyledContent,
+    excel_quirks,
+    natsort_order,
+    natsort_rank,
+)
+from lighting_paperwork.html_writer import TextSink
+from lighting_paperwork.paperwork import (
+    PaperworkGenerator,
+    StyleDataParams,
+    StyleFieldParams,
+    TableChunk,
+    TableStyler,
+)
 from lighting_paperwork.style import default_position_style
 
 logger = logging.getLogger(__name__)
 
 
+@cache
+def position_classifier(regexes: tuple[str, ...]) -> Callable[[str], int]:
+    """Compile position regexes into a single classifier.
+
+    Args:
+        regexes: Position regexes, in printed order
+
+    Returns:
+        A function that returns the index of the first regex matching a position name,
+            or `len(regexes)` if none match.
+
+    """
+    # Alternatives are tried in order, so the first matching regex wins
+    pattern = re.compile("|".join(f"(?P<category{idx}>{r})" for idx, r in enumerate(regexes)))
+
+    def classify(position: str) -> int:
+        match = pattern.match(position)
+        if match is None or match.lastgroup is None:
+            return len(regexes)
+        return int(match.lastgroup.removeprefix("category"))
+
+    return classify
+
+
 class InstrumentSchedule(PaperworkGenerator):
     """Generate an instrument schedule.
 
@@ -35,6 +73,8 @@ class InstrumentSchedule(PaperworkGenerator):
     col_widths = (5, 17, 36, 28, 7, 7)
     display_name = "Instrument Schedule"
     primary_col_name = "U#"
+    # Positions are laid out as separate tables
+    chunkable = False
     # Order of these regexes defines the printed order
     # TODO(eosti): support appending letters like `A`
     # https://github.com/eosti/lighting-paperwork/issues/15
@@ -50,36 +90,44 @@ class InstrumentSchedule(PaperworkGenerator):
         r"^[DU]?S[RL]? Boom\s?\d*$",
         r"^[DU]?S[RL]? Ladder\s?\d*$",
     )
+    filter_fields = (
+        "Position",
+        "Unit Number",
+        "Purpose",
+        "Instrument Type",
+        "Wattage",
+        "Accessory String",
+        "Accessory Flag",
+        "Color",
+        "Gobo 1",
+        "Gobo 2",
+        "Channel",
+        "Absolute Address",
+    )
 
     @override
-    def generate_df(self) -> Self:
-        filter_fields = [
-            "Position",
-            "Unit Number",
-            "Purpose",
-            "Instrument Type",
-            "Wattage",
-            "Accessory String",
-            "Accessory Flag",
-            "Color",
-            "Gobo 1",
-            "Gobo 2",
-            "Channel",
-            "Absolute Address",
-        ]
+    def generate_base_df(self) -> pd.DataFrame:
+        filter_fields = list(self.filter_fields)
         self.verify_filter_fields(filter_fields)
 
-        self.df = pd.DataFrame(self.vw_export[filter_fields], columns=filter_fields)
+        self.df = self.model.project(
+            [
+                "Position",
+                "Unit Number",
+                "Purpose",
+                "Instr Type & Load & Acc",
+                "Accessory Flag",
+                "Color & Gobo",
+                "Channel",
+                "Addr",
+            ]
+        )
         # Need to have a position to show up in the instrument schedule
         self.df["Position"] = self.df["Position"].replace("", np.nan)
         self.df = self.df.dropna(subset=["Position"])
 
-        self.combine_instrtype().format_address_slash().combine_gelgobo().abbreviate_col_names()
-        self.df["Chan"] = self.df["Chan"].replace("", self.formatting_quirks.empty_str)
-        self.df = self.df.sort_values(
-            by=["Position"],
-            key=natsort_keygen(),  # type: ignore[reportCallIssue, reportArgumentType]
-        )
+        self.abbreviate_col_names()
+        self.df = self.df.iloc[natsort_order(self.df["Position"])]
         self.df = self.df.reset_index(drop=True)
 
         self.df = self.df[
@@ -95,7 +143,13 @@ class InstrumentSchedule(PaperworkGenerator):
             ]
         ]
 
-        return self
+        return self.df  # type: ignore[reportReturnType]
+
+    @override
+    def format_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        df["Chan"] = df["Chan"].replace("", self.formatting_quirks.empty_str)
+        df["Addr"] = df["Addr"].replace("", self.formatting_quirks.empty_str)
+        return df
 
     def split_by_position(self) -> list[tuple[str, pd.DataFrame]]:
         """Split dataframe into multiple dataframes, one per position.
@@ -106,24 +160,29 @@ class InstrumentSchedule(PaperworkGenerator):
 
         """
         # Step one: sort position names
-        unique_vals = self.df["Position"].unique()
-        position_names = self.sort_positions(unique_vals.tolist(), self.position_regexes)
+        positions = self.df["Position"]
+        position_names = self.sort_positions(positions.unique().tolist(), self.position_regexes)
         # TODO(eosti): might be nice to force a linebreak between categories
         # https://github.com/eosti/lighting-paperwork/issues/16
 
-        # Step two: create unique dataframes by position name
+        # Step two: sort every row by position, then by its place within the position
+        position_ranks = pd.Categorical(positions, categories=position_names).codes
+        sort_ranks = [
+            natsort_rank(self.df[col]) for col in ("Purpose", "Chan", "Accessory Flag", "U#")
+        ]
+        order = np.lexsort([*sort_ranks, position_ranks])
+        # It (Accessory Flag) served its purpose o7
+        sorted_df = self.df.iloc[order].drop(["Position", "Accessory Flag"], axis=1)
+        sorted_df = sorted_df.reset_index(drop=True)
+        sorted_positions = position_ranks[order]
+        self.repeated_index_val(sorted_df, groups=sorted_positions)
+
+        # Step three: hand out each position's run of rows
+        bounds = np.searchsorted(sorted_positions, np.arange(len(position_names) + 1))
         sorted_dfs = []
-        for i in position_names:
-            pos_df = self.df.loc[self.df["Position"] == i].copy()
-            pos_df = pos_df.drop(["Position"], axis=1)
-            pos_df = pos_df.sort_values(
-                by=["U#", "Accessory Flag", "Chan", "Purpose"],
-                key=natsort_keygen(),  # type: ignore[reportArgumentType]
-            )
-            pos_df = pos_df.drop("Accessory Flag", axis=1)  # It served its purpose o7
-            pos_df = pos_df.reset_index(drop=True)
-            self.repeated_index_val(pos_df)
-            sorted_dfs.append((i, pos_df))
+        for idx, name in enumerate(position_names):
+            pos_df = sorted_df.iloc[bounds[idx] : bounds[idx + 1]].reset_index(drop=True)
+            sorted_dfs.append((name, pos_df))
 
         return sorted_dfs
 
@@ -140,54 +199,75 @@ class InstrumentSchedule(PaperworkGenerator):
             A sorted list of positions.
 
         """
-        sorted_positions = []
-        for r in regexes:
-            pos = natsorted([x for x in positions if re.match(r, x)])
-            sorted_positions += pos
+        classify = position_classifier(regexes)
+        natsort_key = natsort_keygen()
+        return sorted(positions, key=lambda x: (classify(x), natsort_key(x)))
+
+    @staticmethod
+    def column_css(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[str]:
+        """Return the font, width, and alignment CSS of each column."""
+        col_css = []
+        for idx, col_name in enumerate(columns):
+            css = (
+                f"{kwargs['body_style'].to_css()}; vertical-align: middle; "
+                f"width: {kwargs['col_width'][idx]}%; "
+            )
 
-        # Gather remaining positions
-        sorted_positions += natsorted([x for x in positions if x not in (sorted_positions)])
-        return sorted_positions
+            if col_name in ["Chan", "U#", "Addr"]:
+                css += "text-align: center; "
+            else:
+                css += "text-align: left; "
+            col_css.append(css)
+
+        return col_css
 
     @override
     @staticmethod
     def style_data(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
         chan_border_style = f"{kwargs['border_weight']}px dashed black"
-        style_df = pd.DataFrame().reindex_like(df).astype(str)
-        # Set borders based on channel data
-        prev_row = (None, None)
-        for index, data in df.iterrows():
-            style_df.loc[index, :] = ""  # type: ignore[reportCallIssue, reportArgumentType]
-            if prev_row == (None, None):
-                style_df.loc[index, :] += f"border-bottom: {chan_border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-                prev_row = (index, data)
-                continue
-
-            if data["U#"] == kwargs["quirks"].empty_str:
-                # Same U#, remove dashed line
-                style_df.loc[prev_row[0], :] += "border-bottom: none; "  # type: ignore[reportCallIssue, reportArgumentType]
-                style_df.loc[index, :] += f"border-bottom: {chan_border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-            else:
-                style_df.loc[index, :] += f"border-bottom: {chan_border_style}; "  # type: ignore[reportCallIssue, reportArgumentType]
-
-            prev_row = (index, data)
+        # Set borders based on channel data, no dashed line within the same U#
+        next_repeated = (df["U#"] == kwargs["quirks"].empty_str).shift(-1, fill_value=False)
+        row_css = f"border-bottom: {chan_border_style}; " + pd.Series(
+            np.where(next_repeated, "border-bottom: none; ", ""), index=df.index
+        )
 
         # Last row gets a solid bottom border
-        style_df.loc[prev_row[0], :] += f"border-bottom: {kwargs['border_weight']}px solid black; "  # type: ignore[reportCallIssue, reportArgumentType]
+        if not row_css.empty:
+            row_css.iloc[-1] += f"border-bottom: {kwargs['border_weight']}px solid black; "
 
         # Set font based on column
-        for col_name in style_df:
-            style_df[col_name] += (
-                f"{kwargs['body_style'].to_css()}; vertical-align: middle; "
-                f"width: {kwargs['col_width'][style_df.columns.get_loc(col_name)]}%; "  # type: ignore[reportCallIssue, reportArgumentType]
-            )
+        col_css = InstrumentSchedule.column_css(df.columns, **kwargs)
 
-            if col_name in ["Chan", "U#", "Addr"]:
-                style_df[col_name] += "text-align: center; "
-            else:
-                style_df[col_name] += "text-align: left; "
+        return PaperworkGenerator.broadcast_style(df, row_css, col_css)
+
+    @override
+    @staticmethod
+    def style_classes(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
+        next_repeated = (df["U#"] == kwargs["quirks"].empty_str).shift(-1, fill_value=False)
+        row_classes = np.where(next_repeated, "run-continues", "")
+        if len(row_classes) > 0:
+            row_classes[-1] = "last-row"
 
-        return style_df
+        return PaperworkGenerator.broadcast_style(df, row_classes, [""] * len(df.columns))
+
+    @override
+    @staticmethod
+    def class_styles(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[CSSDict]:
+        return [
+            {
+                "selector": "td",
+                "props": f"border-bottom: {kwargs['border_weight']}px dashed black;",
+            },
+            *PaperworkGenerator.column_class_styles(
+                InstrumentSchedule.column_css(columns, **kwargs)
+            ),
+            # No dashed line within the same U#
+            {"selector": "td.run-continues", "props": "border-bottom: none;"},
+            {
+                "selector": "td.last-row",
+                "props": f"border-bottom: {kwargs['border_weight']}px solid black;",
+            },
+        ]
 
     @override
     @staticmethod
@@ -212,24 +292,17 @@ class InstrumentSchedule(PaperworkGenerator):
         return style
 
     @override
-    def _make_common(self) -> pd.io.formats.style.Styler:
+    def _make_common(
+        self, *, css_classes: bool = False, stream: bool = False, rows: slice = slice(None)
+    ) -> TableStyler:
         raise NotImplementedError("Use _make_position for instrument schedule")
 
     def _make_position(
-        self, position: tuple[str, pd.DataFrame]
-    ) -> tuple[str, pd.io.formats.style.Styler]:
+        self, position: tuple[str, pd.DataFrame], *, css_classes: bool = False, stream: bool = False
+    ) -> tuple[str, TableStyler]:
         """Like _make_common, but operates only on one position's df."""
-        styled = Styler.from_custom_template(
-            str(Path(__file__).parent / "templates"), "header_footer.tpl"
-        )(position[1])  # type: ignore[reportCallIssue, reportArgumentType]
-        styled = styled.apply(
-            type(self).style_data,
-            axis=None,
-            body_style=self.style.body,
-            col_width=self.col_widths,
-            quirks=self.formatting_quirks,
-            border_weight=self.border_weight,
-        )
+        styled = self.make_styler(position[1], css_classes=css_classes, stream=stream)
+        styled = self.style_body(styled, css_classes=css_classes)
         styled = styled.hide()
         styled = styled.apply_index(
             type(self).style_fields,  # type: ignore[reportArgumentType]
@@ -238,62 +311,76 @@ class InstrumentSchedule(PaperworkGenerator):
             border_weight=self.border_weight,
             axis=1,
         )
-        styled = styled.set_table_styles(self.pagebreak_repeated_index(), overwrite=False)
+        styled = self.pagebreak_repeated_index(styled)
         return (position[0], styled)
 
     @override
-    def make_excel(self, excel_path: str) -> None:
-        self.formatting_quirks = excel_quirks
+    def make_excel(self, writer: pd.ExcelWriter) -> None:
+        with self.use_quirks(excel_quirks):
+            self.generate_df()
+            positions = self.split_by_position()
+
+            ws = writer.book.create_sheet(title=self.display_name)
+            section_row = 1
+            for pos in positions:
+                position_name, styled = self._make_position(pos)
+                excel_formatter.add_section_header(
+                    ws, position_name, self.position_style, len(pos[1].columns), row=section_row
+                )
+                styled.to_excel(  # type: ignore[reportAttributeAccessIssue]
+                    writer, sheet_name=self.display_name, startrow=section_row, index=False
+                )
+
+                # Wrap text in the column names and rows, but not the section header
+                last_row = section_row + len(pos[1]) + 1
+                excel_formatter.wrap_all_cells(ws, min_row=section_row + 1, max_row=last_row)
+                # Leave an empty row before the next position
+                section_row = last_row + 2
 
-        self.generate_df()
-        positions = self.split_by_position()
-        sheet_names = []
-
-        for idx, pos in enumerate(positions):
-            _, styled = self._make_position(pos)
-            sheet_names.append(f"inst_sch_tmp_{idx}")
-            with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a") as writer:
-                styled.to_excel(writer, sheet_name=sheet_names[-1])
-
-        wb = openpyxl.load_workbook(excel_path)
-        ws = wb.create_sheet(title=self.display_name, index=-1)
-
-        for idx, sht_name in enumerate(sheet_names):
-            excel_formatter.add_section_header(
-                ws, positions[idx][0], self.position_style, len(self.df.columns) - 1
-            )
-            sht = wb[sht_name]
-            cur_max = ws.max_row
-
-            # remove index column
-            sht.delete_cols(idx=1)
+        excel_formatter.add_title(ws, self.display_name, self.show_data)
+        excel_formatter.page_setup(ws, 0)
+        excel_formatter.set_col_widths(ws, self.col_widths, self.page_width)
+        excel_formatter.instr_schedule_pagebreaks(ws)
 
-            # Copy cells over with formatting
-            for i in range(1, sht.max_row + 1):
-                for j in range(1, sht.max_column + 1):
-                    dest_cell = ws.cell(row=cur_max + i, column=j)
-                    dest_cell.value = sht.cell(row=i, column=j).value
-                    if sht.cell(row=i, column=j).has_style:
-                        dest_cell._style = copy(sht.cell(row=i, column=j)._style)  # noqa: SLF001, # type: ignore[reportCallIssue, reportArgumentType]
+    @override
+    def write_excel(self, workbook: Workbook, styles: ExcelStyles) -> None:
+        ws = workbook.create_sheet(title=self.display_name)
+        excel_formatter.add_title(ws, self.display_name, self.show_data)
+        excel_formatter.page_setup(ws, 0)
+        excel_formatter.set_col_widths(ws, self.col_widths, self.page_width, len(self.col_widths))
 
-                    # Wrap text here to avoid messing with the headers
-                    alignment = copy(dest_cell.alignment)
-                    alignment.wrapText = True
-                    dest_cell.alignment = alignment
+        with self.use_quirks(excel_quirks):
+            self.generate_df()
+            positions = self.split_by_position()
 
-            # Add an empty row at bottom
-            ws.cell(ws.max_row + 1, 1).value = None
+            sheet = ExcelSheetWriter(ws, styles)
+            for idx, pos in enumerate(positions):
+                if idx > 0:
+                    # Leave an empty row before the next position
+                    sheet.skip_row()
+                position_name, styled = self._make_position(pos, stream=True)
+                sheet.write_section_header(position_name, self.position_style, len(pos[1].columns))
+                sheet.write_table(styled)  # type: ignore[reportArgumentType]
 
-            del wb[sht_name]
+        # The sheet can't be read back, so its rows are laid out again
+        excel_formatter.instr_schedule_pagebreaks(ws, self.excel_rows(positions))
 
-        excel_formatter.add_title(ws, self.display_name, self.show_data)
-        excel_formatter.page_setup(ws, 0)
-        excel_formatter.set_col_widths(ws, self.col_widths, self.page_width)
-        excel_formatter.instr_schedule_pagebreaks(ws)
-        wb.save(excel_path)
+    @staticmethod
+    def excel_rows(positions: list[tuple[str, pd.DataFrame]]) -> Iterator[list[object]]:
+        """Yield the cell values of each row of the sheet that positions are written to."""
+        for idx, (position_name, df) in enumerate(positions):
+            if idx > 0:
+                yield []
+            yield [position_name]
+            yield list(df.columns)
+            for row in df.itertuples(index=False):
+                yield ExcelSheetWriter.cell_values(row)
 
     @override
-    def make_html(self) -> str:
+    def write_html(self, sink: TextSink, chunk: TableChunk | None = None) -> None:
+        if chunk is not None:
+            raise NotImplementedError("The instrument schedule can't be split into chunks")
+
         self.generate_df()
         positions = self.split_by_position()
 
@@ -302,11 +389,15 @@ class InstrumentSchedule(PaperworkGenerator):
             "instr", "bottom-right", self.style.marginals.to_css()
         )
 
-        output_html = page_style
-        output_html += header_html
-        output_html += "<div id='inst-schedule-container'>\n"
+        container_open, container_close = self.table_container()
+        sink.write(container_open)
+        sink.write(page_style)
+        sink.write(header_html)
+        sink.write("<div id='inst-schedule-container'>\n")
         for pos in positions:
-            position_name, styled = self._make_position(pos)
+            position_name, styled = self._make_position(
+                pos, css_classes=self.css_classes, stream=self.stream_html
+            )
             styled = styled.set_table_attributes('class="paperwork-table"')
             styled = styled.set_table_styles(self.default_table_style(), overwrite=False)
             styled = styled.set_table_styles(
@@ -319,14 +410,10 @@ class InstrumentSchedule(PaperworkGenerator):
                 left=StyledContent(position_name, self.position_style.to_css()),
             )
 
-            output_html += styled.to_html(
-                generated_header=header_html,
-            )
+            self.render_html(styled, sink, generated_header=header_html)
 
-        output_html += "\n</div>"
-        output_html += footer_html
-        output_html = self.wrap_table(output_html)
+        sink.write("\n</div>")
+        sink.write(footer_html)
+        sink.write(container_close)
 
         logger.info("Generated instrument schedule.")
-
-        return output_html
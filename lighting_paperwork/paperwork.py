@@ -1,32 +1,39 @@
 """Base paperwork generation class."""
 
+import io
 import logging
-import re
 from abc import ABC, abstractmethod
-from pathlib import Path
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import pairwise
 from typing import NotRequired, Self, TypedDict, Unpack
 
 import numpy as np
-import openpyxl
 import pandas as pd
+from openpyxl.workbook.workbook import Workbook
 from pandas.io.formats.style import Styler
 from pandas.io.formats.style_render import CSSDict
 
 from lighting_paperwork import excel_formatter
+from lighting_paperwork.excel_writer import ExcelSheetWriter, ExcelStyles
 from lighting_paperwork.helpers import (
-    DMXAddress,
     FontStyle,
     FormattingQuirks,
-    InstrumentPower,
     ShowData,
     StyledContent,
     excel_quirks,
     html_quirks,
 )
+from lighting_paperwork.html_writer import HTMLTableWriter, TextSink
+from lighting_paperwork.show_model import ShowModel
 from lighting_paperwork.style import BaseStyle, default_style
+from lighting_paperwork.styler_templates import styler_templates
 
 logger = logging.getLogger(__name__)
 
+TableStyler = Styler | HTMLTableWriter
+
 
 class StyleDataParams(TypedDict):
     """**kwargs for style_data functions."""
@@ -46,6 +53,22 @@ class StyleFieldParams(TypedDict):
     border_weight: float
 
 
+@dataclass
+class TableChunk:
+    """A run of table rows laid out as a document of its own.
+
+    Attributes:
+        rows: The rows of the generated DataFrame in the chunk
+        first_page: Page number of the chunk's first page in the whole table
+        total_pages: Page count of the whole table, or None if it isn't known yet
+
+    """
+
+    rows: slice
+    first_page: int = 1
+    total_pages: int | None = None
+
+
 class PaperworkGenerator(ABC):
     """Base paperwork generation class.
 
@@ -54,20 +77,40 @@ class PaperworkGenerator(ABC):
 
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
-        vw_export: pd.DataFrame,
+        vw_export: pd.DataFrame | ShowModel,
         show_data: ShowData | None = None,
         style: BaseStyle = default_style,
         border_weight: float = 1.0,
+        *,
+        css_classes: bool = False,
+        stream_html: bool = False,
     ) -> None:
-        """Set class vars for data and style."""
-        self.vw_export = vw_export
+        """Set class vars for data and style.
+
+        Args:
+            vw_export: The VW export to generate paperwork from, or a model of it
+                shared with other generators
+            show_data: Show information for the header
+            style: Fonts to use
+            border_weight: Weight of table borders, in px
+            css_classes: Style HTML table cells with classes and a shared stylesheet
+                instead of inline per-cell CSS. Much smaller output for large shows.
+            stream_html: Render HTML with the streaming :class:`HTMLTableWriter`
+                instead of a pandas Styler.
+
+        """
+        self.model = vw_export if isinstance(vw_export, ShowModel) else ShowModel(vw_export)
+        self.vw_export = self.model.vw_export
         self.df = self.vw_export.copy()
+        self._base_df: pd.DataFrame | None = None
         self.show_data = show_data
         self.style = style
         # 1px doesn't render right on Firefox, use 1.5px min to workaround.
         self.border_weight = border_weight
+        self.css_classes = css_classes
+        self.stream_html = stream_html
 
     def set_show_data(self, show_name: str, ld_name: str, revision: str) -> None:
         """Save show data for later use."""
@@ -76,43 +119,136 @@ class PaperworkGenerator(ABC):
     display_name: str
     primary_col_name: str
     col_widths: tuple[int, ...]
+    # Columns of the VW export that the paperwork is generated from
+    filter_fields: tuple[str, ...] = ()
     page_width: int = 100
     formatting_quirks = html_quirks
-    no_color_text = "N/C"
+    # Whether the HTML table can be split into chunks, see :func:`chunk_table`
+    chunkable: bool = True
 
     @abstractmethod
-    def generate_df(self) -> Self:
+    def generate_base_df(self) -> pd.DataFrame:
         """Generate a DataFrame with sorted information.
 
-        Using `self.vw_export`, generate a DataFrame that contains the
+        Using `self.model`, generate a DataFrame that contains the
         necessary sorted information for the paperwork type.
+        This must not depend on `self.formatting_quirks`, see :func:`format_df`.
+        """
+
+    def format_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the parts of the DataFrame that depend on `self.formatting_quirks`.
+
+        Args:
+            df: A copy of the DataFrame from :func:`generate_base_df`, may be modified
+
         """
+        return df
+
+    def generate_df(self) -> Self:
+        """Generate `self.df` for the current formatting quirks.
+
+        The result of :func:`generate_base_df` is kept, so generating the same paperwork
+            for another export format only has to re-apply :func:`format_df`.
+        """
+        if self._base_df is None:
+            self._base_df = self.generate_base_df()
+
+        self.df = self.format_df(self._base_df.copy())
+        return self
+
+    @contextmanager
+    def use_quirks(self, quirks: FormattingQuirks) -> Iterator[None]:
+        """Temporarily use different formatting quirks, ex. for Excel exports."""
+        previous_quirks = self.formatting_quirks
+        self.formatting_quirks = quirks
+        try:
+            yield
+        finally:
+            self.formatting_quirks = previous_quirks
 
     @staticmethod
     @abstractmethod
     def style_data(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
         """Styles the data for a table."""
 
+    @staticmethod
+    @abstractmethod
+    def style_classes(df: pd.DataFrame, /, **kwargs: Unpack[StyleDataParams]) -> pd.DataFrame:
+        """Return the CSS classes of each cell for a table, see :func:`class_styles`."""
+
+    @staticmethod
+    @abstractmethod
+    def class_styles(columns: pd.Index, /, **kwargs: Unpack[StyleDataParams]) -> list[CSSDict]:
+        """Return the stylesheet for the classes from :func:`style_classes`.
+
+        Together these style a table the same as :func:`style_data`.
+        """
+
     @staticmethod
     @abstractmethod
     def style_fields(index: pd.Series, /, **kwargs: Unpack[StyleFieldParams]) -> list[str]:
         """Style the fields (i.e. headers) for a table."""
 
-    def _make_common(self) -> pd.io.formats.style.Styler:
-        """Run common make tasks for html and excel."""
-        self.generate_df()
+    def style_params(self) -> StyleDataParams:
+        """Return the **kwargs for the style_data functions."""
+        return {
+            "body_style": self.style.body,
+            "col_width": list(self.col_widths),
+            "border_weight": self.border_weight,
+            "quirks": self.formatting_quirks,
+        }
 
-        styled = Styler.from_custom_template(
-            str(Path(__file__).parent / "templates"), "header_footer.tpl"
-        )(self.df)
-        styled = styled.apply(
-            type(self).style_data,
-            axis=None,
-            body_style=self.style.body,
-            col_width=self.col_widths,
-            border_weight=self.border_weight,
-            quirks=self.formatting_quirks,
+    def style_body(self, styled: TableStyler, *, css_classes: bool = False) -> TableStyler:
+        """Style the data cells of a table.
+
+        Args:
+            styled: Styler of the table
+            css_classes: Tag cells with classes from a shared stylesheet instead
+                of giving each cell its own CSS.
+
+        """
+        if not css_classes:
+            return styled.apply(type(self).style_data, axis=None, **self.style_params())
+
+        styled = styled.set_td_classes(type(self).style_classes(styled.data, **self.style_params()))  # type: ignore[reportArgumentType]
+        return styled.set_table_styles(
+            type(self).class_styles(styled.data.columns, **self.style_params()),  # type: ignore[reportAttributeAccessIssue]
+            overwrite=False,
         )
+
+    @staticmethod
+    def make_styler(
+        df: pd.DataFrame, *, css_classes: bool = False, stream: bool = False
+    ) -> TableStyler:
+        """Create the Styler for a table.
+
+        Args:
+            df: The table to style
+            css_classes: Whether the cells will be styled with classes
+            stream: Use the streaming :class:`HTMLTableWriter` instead of a pandas Styler.
+                Only HTML can be rendered from it, or Excel with :class:`ExcelSheetWriter`.
+
+        """
+        if stream:
+            return HTMLTableWriter(df)
+
+        return styler_templates.styler()(df, cell_ids=not css_classes)
+
+    def _make_common(
+        self, *, css_classes: bool = False, stream: bool = False, rows: slice = slice(None)
+    ) -> TableStyler:
+        """Run common make tasks for html and excel.
+
+        Args:
+            css_classes: Whether cells are styled with classes, see :func:`style_body`
+            stream: Whether to use the streaming :class:`HTMLTableWriter`
+            rows: The rows of the generated DataFrame to include
+
+        """
+        self.generate_df()
+
+        styled = self.make_styler(self.df.iloc[rows], css_classes=css_classes, stream=stream)
+        styled = self.style_body(styled, css_classes=css_classes)
         styled = styled.hide()
         styled = styled.apply_index(
             type(self).style_fields,  # type: ignore[reportArgumentType]
@@ -124,9 +260,27 @@ class PaperworkGenerator(ABC):
 
         return styled  # noqa: RET504
 
-    def make_html(self) -> str:
-        """Generate a formatted HTML table from the generated DataFrame."""
-        styled = self._make_common()
+    def make_html(self, chunk: TableChunk | None = None) -> str:
+        """Generate a formatted HTML table from the generated DataFrame, see :func:`write_html`."""
+        html = io.StringIO()
+        self.write_html(html, chunk)
+        return html.getvalue()
+
+    def write_html(self, sink: TextSink, chunk: TableChunk | None = None) -> None:
+        """Write a formatted HTML table from the generated DataFrame to a text sink.
+
+        With `stream_html`, rows are written to the sink as they are rendered.
+
+        Args:
+            sink: Where to write the HTML
+            chunk: Only write these rows, numbering the pages as part of the whole table.
+                Only the first chunk is bookmarked.
+
+        """
+        chunk = TableChunk(slice(None)) if chunk is None else chunk
+        styled = self._make_common(
+            css_classes=self.css_classes, stream=self.stream_html, rows=chunk.rows
+        )
 
         styled = styled.set_table_attributes('class="paperwork-table"')
         styled = styled.set_table_styles(
@@ -138,29 +292,55 @@ class PaperworkGenerator(ABC):
             styled.uuid,  # type: ignore[reportAttributeAccessIssue]
             "bottom-right",
             self.style.marginals.to_css(),
+            first_page=chunk.first_page,
+            total_pages=chunk.total_pages,
         )
 
         logger.info("Generated %s.", self.display_name)
 
-        html = styled.to_html(
+        container_open, container_close = self.table_container(
+            bookmark=chunk.rows.start in (None, 0)
+        )
+        sink.write(container_open)
+        self.render_html(
+            styled,
+            sink,
             generated_header=header_html,
             generated_footer=footer_html,
             generated_page_style=page_style,
         )
-        html = self.wrap_table(html)
+        sink.write(container_close)
 
-        return html  # noqa: RET504
+    def page_number_style(self, chunk: TableChunk) -> str:
+        """Return the page number <style> that :func:`write_html` writes for a chunk."""
+        return self.generate_page_number_style(
+            "bottom-right",
+            self.style.marginals.to_css(),
+            first_page=chunk.first_page,
+            total_pages=chunk.total_pages,
+        )
 
-    def make_excel(self, excel_path: str) -> None:
-        """Add a sheet to an Excel file with the formatted DataFrame."""
-        self.formatting_quirks = excel_quirks
-        styled = self._make_common()
+    @staticmethod
+    def render_html(styled: TableStyler, sink: TextSink, **kwargs: str) -> None:
+        """Render a styled table to a text sink, streaming it if possible."""
+        if isinstance(styled, HTMLTableWriter):
+            styled.write(sink, **kwargs)
+        else:
+            sink.write(styled.to_html(**kwargs))  # type: ignore[reportCallIssue, reportArgumentType]
 
-        with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a") as writer:
-            styled.to_excel(writer, sheet_name=self.display_name)
+    def make_excel(self, writer: pd.ExcelWriter) -> None:
+        """Add a sheet with the formatted DataFrame to an Excel workbook.
 
-        wb = openpyxl.load_workbook(excel_path)
-        ws = wb[self.display_name]
+        Args:
+            writer: An openpyxl ExcelWriter holding the workbook in memory. The caller
+                saves the workbook once every sheet has been added.
+
+        """
+        with self.use_quirks(excel_quirks):
+            styled = self._make_common()
+            styled.to_excel(writer, sheet_name=self.display_name)  # type: ignore[reportAttributeAccessIssue]
+
+        ws = writer.book[self.display_name]
 
         # Remove index column
         ws.delete_cols(idx=1)
@@ -170,7 +350,26 @@ class PaperworkGenerator(ABC):
         excel_formatter.page_setup(ws, 1)
         excel_formatter.set_col_widths(ws, self.col_widths, self.page_width)
         excel_formatter.wrap_all_cells(ws)
-        wb.save(excel_path)
+
+    def write_excel(self, workbook: Workbook, styles: ExcelStyles) -> None:
+        """Add a sheet with the formatted DataFrame to a write-only Excel workbook.
+
+        Like :func:`make_excel`, but rows are written to the sheet as they are generated,
+            and cells are styled with the workbook's shared named styles.
+
+        Args:
+            workbook: A write-only openpyxl workbook
+            styles: The named styles of the workbook
+
+        """
+        with self.use_quirks(excel_quirks):
+            styled = self._make_common(stream=True)
+
+        ws = workbook.create_sheet(title=self.display_name)
+        excel_formatter.add_title(ws, self.display_name, self.show_data)
+        excel_formatter.page_setup(ws, 1)
+        excel_formatter.set_col_widths(ws, self.col_widths, self.page_width, len(self.df.columns))
+        ExcelSheetWriter(ws, styles).write_table(styled)  # type: ignore[reportArgumentType]
 
     @staticmethod
     def verify_width(width: list[int]) -> bool:
@@ -182,181 +381,70 @@ class PaperworkGenerator(ABC):
         return True
 
     @staticmethod
-    def determine_power(row: pd.Series) -> InstrumentPower:
-        """Determine an instrument's power from the Instrument Type and Wattage fields.
+    def broadcast_style(
+        df: pd.DataFrame, row_css: pd.Series | np.ndarray | str, col_css: list[str]
+    ) -> pd.DataFrame:
+        """Build a style DataFrame for `df` from per-row and per-column CSS.
 
-        When the fields disagree, the values from the Wattage field takes priority.
-        When either field shows 0W, the other field will take priority.
+        Each cell is styled with its row's CSS followed by its column's CSS.
 
         Args:
-            row: Row of a dataframe that must have a "Wattage" and a "Instrument Type" column.
-
-        Returns:
-            The determined power of an instrument.
+            df: The DataFrame being styled
+            row_css: CSS for each row, or a single string for every row
+            col_css: CSS for each column of `df`
 
         """
-        # Collect potential powers
-        wattage_field_power = InstrumentPower(row["Wattage"])
-        powerstr = re.search(InstrumentPower.POWER_REGEX, row["Instrument Type"])
-        if powerstr is None:
-            instrument_type_power = InstrumentPower(0)
-        else:
-            instrument_type_power = InstrumentPower(powerstr.group())
-
-        # Verify which we should use
-        if wattage_field_power.power == 0 and instrument_type_power.power == 0:
-            # No power provided
-            if row["Accessory Flag"] != "1":
-                logger.warning(
-                    "Channel %s is infinitely efficient (%s is %s)",
-                    row["Channel"],
-                    row["Instrument Type"],
-                    wattage_field_power.format(),
-                )
-            power = wattage_field_power
-        elif wattage_field_power.power > 0 and instrument_type_power.power == 0:
-            # There was a power in the wattage field but none parsed from instrument type
-            power = wattage_field_power
-        elif instrument_type_power.power > 0 and wattage_field_power.power == 0:
-            # There was a power in the instrument type field but none in the wattage field
-            power = instrument_type_power
-        elif (
-            wattage_field_power.power > 0
-            and instrument_type_power.power > 0
-            and wattage_field_power.power != instrument_type_power.power
-        ):
-            # Fields disagree, prefer the wattage field
-            logger.warning(
-                "Channel %s has conflicting power values (%s, %s). Using %s.",
-                row["Channel"],
-                wattage_field_power.format(),
-                instrument_type_power.format(),
-                wattage_field_power.format(),
-            )
-            power = wattage_field_power
-        elif wattage_field_power.power == instrument_type_power.power:
-            # Same power found in instrument type and wattage fields
-            power = wattage_field_power
-        else:
-            raise ValueError("Shouldn't get here!")
-
-        return power
-
-    def combine_instrtype(self) -> Self:
-        """Combine the Instrument Type and Power and Accessory fields into one."""
-        instload = []
-        for _, row in self.df.iterrows():
-            power = self.determine_power(row)
-
-            # Make sure power shows up once, after the instrument type
-            if power.power == 0:
-                tmp = row["Instrument Type"].strip()
-            else:
-                # Remove from instrument type (if existing)
-                instrtype = re.sub(InstrumentPower.POWER_REGEX, "", row["Instrument Type"]).strip()
-                tmp = instrtype + " " + power.format()
-
-            # If accessory, add that here
-            if row["Accessory String"] != "":
-                tmp += ", " + row["Accessory String"]
-
-            instload.append(tmp)
-
-        # Clean up by replacing old cols with new one
-        new_df = self.df.drop(["Instrument Type", "Wattage", "Accessory String"], axis=1)
-        new_df["Instr Type & Load & Acc"] = instload
-
-        self.df = new_df
-        return self
-
-    def combine_gelgobo(self) -> Self:
-        """Combine the Gel and Gobo fields into one."""
-        gelgobo = []
-        for _, row in self.df.iterrows():
-            # If no gel replace with N/C
-            if row["Color"] == "":
-                tmp = "" if row["Accessory Flag"] == "1" else self.no_color_text
-            else:
-                tmp = row["Color"]
-
-            # Append gobo if exists
-            if row["Gobo 1"] != "" and row["Gobo 2"] != "":
-                tmp += ", T: " + row["Gobo 1"] + ", " + row["Gobo 2"]
-            elif row["Gobo 1"] != "":
-                tmp += ", T: " + row["Gobo 1"]
-            elif row["Gobo 2"] != "":
-                tmp += ", T: " + row["Gobo 2"]
-
-            gelgobo.append(tmp)
-
-        # Clean up by replacing old cols with new one
-        new_df = self.df.drop(["Color", "Gobo 1", "Gobo 2"], axis=1)
-        new_df["Color & Gobo"] = gelgobo
-        self.df = new_df
-
-        return self
+        row_css = pd.Series(row_css, index=df.index, dtype=str)
+        return pd.DataFrame(
+            {col: row_css + css for col, css in zip(df.columns, col_css, strict=True)},
+            index=df.index,
+            columns=df.columns,
+        )
 
-    def format_address_slash(self) -> Self:
-        """Format an absolute address into a Universe/Address string."""
-        for row in self.df.itertuples():
-            absaddr = int(self.df.loc[row.Index, "Absolute Address"])  # type: ignore[reportCallIssue, reportArgumentType]
-            if absaddr == 0:
-                # If no address set, replace it with a blank
-                self.df.loc[row.Index, "Absolute Address"] = self.formatting_quirks.empty_str
-            else:
-                self.df.loc[row.Index, "Absolute Address"] = DMXAddress(
-                    absaddr
-                ).format_slash_conditional()
-
-        slashed_df = self.df.rename(columns={"Absolute Address": "Addr"})
-        self.df = slashed_df
-        return self
+    @staticmethod
+    def column_class_styles(col_css: list[str]) -> list[CSSDict]:
+        """Return a stylesheet that applies CSS to each column's data cells."""
+        return [{"selector": f"td.col{idx}", "props": css} for idx, css in enumerate(col_css)]
 
-    def repeated_index_val(self, df_override: pd.DataFrame | None = None) -> Self:
+    def repeated_index_val(
+        self, df_override: pd.DataFrame | None = None, groups: np.ndarray | None = None
+    ) -> Self:
         """Format repeated channel numbers to use `"` to represent repeated data.
 
         Arguments:
             df_override: Override the use of self.df with a different dataframe
+            groups: Group of each row, if the dataframe holds several tables back to back.
+                Rows only repeat the previous row of the same group.
 
         """
         df = df_override if df_override is not None else self.df
-        repeated_idx = "-1"
+        empty_str = self.formatting_quirks.empty_str
 
-        prev_row: pd.Series | None = None
-        for df_index, data in df.iterrows():
-            if prev_row is None:
-                # Initial case
-                prev_row = data
+        # Rows that continue a run of the same index value
+        index_col = df[self.primary_col_name]
+        repeated = index_col == index_col.shift()
+        if groups is not None:
+            repeated &= np.concatenate(([False], groups[1:] == groups[:-1]))
+
+        for col in df.columns:
+            if col == self.primary_col_name:
+                continue
+            if self.primary_col_name == "Chan" and col == "U#":
+                # Do repeat U# to avoid confusion
                 continue
 
-            tmp_prev = None
-            if (
-                data[self.primary_col_name] == repeated_idx
-                or data[self.primary_col_name] == prev_row[self.primary_col_name]
-            ):
-                if data[self.primary_col_name] == prev_row[self.primary_col_name]:
-                    # first repeat case
-                    repeated_idx = data[self.primary_col_name]
-
-                tmp_prev = data.copy()
-                for idx, val in data.items():
-                    if idx == self.primary_col_name:
-                        # Don't "-ify the index string, just leave it blank
-                        df.loc[df_index, str(idx)] = self.formatting_quirks.empty_str
-                        continue
-                    if self.primary_col_name == "Chan" and idx == "U#":
-                        # Do repeat U# to avoid confusion
-                        continue
-                    if val.strip() == "" or val == self.formatting_quirks.empty_str:
-                        # Don't "-ify already empty fields
-                        continue
-                    if val == prev_row[str(idx)]:
-                        df.loc[df_index, str(idx)] = '"'
-            else:
-                tmp_prev = data
-                repeated_idx = "-1"
-
-            prev_row = tmp_prev
+            # Don't "-ify already empty fields
+            values = df[col]
+            same_as_prev = (
+                repeated
+                & (values == values.shift())
+                & (values.str.strip() != "")
+                & (values != empty_str)
+            )
+            df[col] = values.mask(same_as_prev, '"')
+
+        # Don't "-ify the index string, just leave it blank
+        df[self.primary_col_name] = index_col.mask(repeated, empty_str)
 
         return self
 
@@ -375,14 +463,7 @@ class PaperworkGenerator(ABC):
 
     def verify_filter_fields(self, filter_fields: list[str]) -> None:
         """Verify certain fields exist in the dataframe."""
-        for field in filter_fields:
-            if field not in self.vw_export.columns:
-                logger.warning("Field `%s` not present in export", field)
-                logger.info(
-                    "In Spotlight Preferences > Lightwright, add `%s` to the export fields list.",
-                    field,
-                )
-                self.vw_export[field] = ""
+        self.model.verify_fields(filter_fields)
 
     # Note: Firefox really doesn't like printing 1px borders with border-collapse: collapse
     def default_table_style(self, width: int = 100) -> list[CSSDict]:
@@ -405,19 +486,46 @@ class PaperworkGenerator(ABC):
             },
         ]
 
-    def pagebreak_repeated_index(self) -> list[CSSDict]:
-        """Disallow pagebreaks between index fields with the same number."""
-        idxs = np.where(self.df[self.primary_col_name] == self.formatting_quirks.empty_str)
+    def run_starts(self) -> np.ndarray:
+        """Return the rows of the generated DataFrame that start a run of related rows.
 
-        selector_list = []
-        # We want to select the row before a repeated channel,
-        # but CSS selectors index from 1. These cancel out.
-        selector_list.extend(f"tr:nth-child({i - 1 + 1})" for i in np.transpose(*idxs))
+        By default every row stands alone.
+        """
+        return np.arange(len(self.df))
 
-        style_list = []
-        style_list.extend({"selector": i, "props": "break-after: avoid;"} for i in selector_list)
+    def chunk_table(self, chunk_rows: int) -> list[slice]:
+        """Split the rows of the table into chunks of at most `chunk_rows` rows.
 
-        return style_list
+        Chunks only end before a row from :func:`run_starts`, so a run longer than
+            `chunk_rows` gets a chunk of its own.
+        """
+        self.generate_df()
+        run_starts = self.run_starts()
+        bounds = [0]
+        while len(self.df) - bounds[-1] > chunk_rows:
+            # Last run that starts early enough to fill the chunk
+            idx = int(np.searchsorted(run_starts, bounds[-1] + chunk_rows, side="right")) - 1
+            if run_starts[idx] <= bounds[-1]:
+                idx += 1
+            if idx == len(run_starts):
+                break
+            bounds.append(int(run_starts[idx]))
+
+        bounds.append(len(self.df))
+        return [slice(start, stop) for start, stop in pairwise(bounds)]
+
+    def pagebreak_repeated_index(self, styled: TableStyler) -> TableStyler:
+        """Disallow pagebreaks between index fields with the same number.
+
+        Rows that repeat the index of the row above them are tagged with one class, so a
+            single CSS rule covers the whole table.
+        """
+        repeated = styled.data[self.primary_col_name] == self.formatting_quirks.empty_str
+        styled = styled.set_tr_classes(np.where(repeated, "repeated-index", "").tolist())  # type: ignore[reportAttributeAccessIssue]
+        return styled.set_table_styles(
+            [{"selector": "tr.repeated-index", "props": "break-before: avoid;"}],
+            overwrite=False,
+        )
 
     def generate_metadata(self) -> str:
         """Generate HTML metadata from show data."""
@@ -444,13 +552,25 @@ class PaperworkGenerator(ABC):
 
     def wrap_table(self, html: str) -> str:
         """Wrap a generated HTML table with bookmarks and anchors."""
-        return f"""
+        container_open, container_close = self.table_container()
+        return container_open + html + container_close
+
+    def table_container(self, *, bookmark: bool = True) -> tuple[str, str]:
+        """Return the opening and closing HTML of :func:`wrap_table`."""
+        bookmark_style = (
+            f"bookmark-level: 1; bookmark-label: '{self.display_name}'; bookmark-state: open;"
+            if bookmark
+            else ""
+        )
+        return (
+            f"""
         <div id="{self.display_name.replace(" ", "")}" class="report-container"
-        style="break-after: page; bookmark-level: 1;
-        bookmark-label: '{self.display_name}'; bookmark-state: open;">
-            {html}
+        style="break-after: page; {bookmark_style}">
+            """,
+            """
         </div>
-        """
+        """,
+        )
 
     def generate_header_footer(self, uuid: str) -> tuple[str, str]:
         """Generate a header and footer from show data."""
@@ -538,12 +658,26 @@ class PaperworkGenerator(ABC):
 
     @staticmethod
     def generate_page_style(
-        uuid: str, pagenum_pos: str | None = None, pagenum_style: str = ""
+        uuid: str,
+        pagenum_pos: str | None = None,
+        pagenum_style: str = "",
+        *,
+        first_page: int = 1,
+        total_pages: int | None = None,
     ) -> str:
         """Generate a <style> for the table header and footer.
 
         This establishes the header and footer elements as running, and will insert them
             in the page marginals during printing instead of embedded in the table.
+        The page number is styled by its own <style>, see :func:`generate_page_number_style`.
+
+        Args:
+            uuid: Unique id of the table
+            pagenum_pos: Page margin to show the page number in
+            pagenum_style: CSS for the page number
+            first_page: Number of the first page
+            total_pages: Page count to show, or None to count the pages of the document
+
         """
         style = ""
         page_style = ""
@@ -553,23 +687,22 @@ class PaperworkGenerator(ABC):
                 var_name = f"{pos}{side.capitalize()}"
 
                 if pagenum_pos == location_name:
-                    page_style += f"""
-                        @{location_name} {{
-                            content: "Page " counter(page) " of " counter(pages);
-                            {pagenum_style}
-                        }}
-                    """
-                else:
-                    style += f"""
-                        .{location_name}-{uuid} {{
-                            position: running({var_name}-{uuid});
-                        }}
-                        """
-                    page_style += f"""
-                        @{location_name} {{
-                            content: element({var_name}-{uuid});
-                        }}
+                    continue
+
+                style += f"""
+                    .{location_name}-{uuid} {{
+                        position: running({var_name}-{uuid});
+                    }}
                     """
+                page_style += f"""
+                    @{location_name} {{
+                        content: element({var_name}-{uuid});
+                    }}
+                """
+
+        page_number_style = PaperworkGenerator.generate_page_number_style(
+            pagenum_pos, pagenum_style, first_page=first_page, total_pages=total_pages
+        )
 
         return f"""
         <style>
@@ -578,4 +711,49 @@ class PaperworkGenerator(ABC):
             {page_style}
         }}
         </style>
+        {page_number_style}
+        """
+
+    @staticmethod
+    def generate_page_number_style(
+        pagenum_pos: str | None = None,
+        pagenum_style: str = "",
+        *,
+        first_page: int = 1,
+        total_pages: int | None = None,
+    ) -> str:
+        """Generate a <style> for the page number.
+
+        This doesn't depend on the table, so the page numbering of rendered HTML can be
+            changed by replacing just this <style>.
+
+        Args:
+            pagenum_pos: Page margin to show the page number in
+            pagenum_style: CSS for the page number
+            first_page: Number of the first page
+            total_pages: Page count to show, or None to count the pages of the document
+
+        """
+        page_style = ""
+        if pagenum_pos is not None:
+            page_count = "counter(pages)" if total_pages is None else f'"{total_pages}"'
+            page_style = f"""
+            @page {{
+                @{pagenum_pos} {{
+                    content: "Page " counter(page) " of " {page_count};
+                    {pagenum_style}
+                }}
+            }}
+            """
+
+        # Without a counter-reset the page counter is incremented from 0
+        first_page_style = (
+            f"@page :first {{ counter-reset: page {first_page}; }}" if first_page != 1 else ""
+        )
+
+        return f"""
+        <style>
+        {page_style}
+        {first_page_style}
+        </style>
         """
@@ -1,14 +1,21 @@
 """Paperwork exporters to various filetypes."""
 
+import io
 import logging
 import sys
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 from pathlib import Path
+from typing import TextIO
 
-import openpyxl
-from openpyxl.workbook import Workbook
+import pandas as pd
+import pypdf
+from openpyxl.workbook.workbook import Workbook
 
-from lighting_paperwork.paperwork import PaperworkGenerator
+from lighting_paperwork.excel_writer import ExcelStyles
+from lighting_paperwork.paperwork import PaperworkGenerator, TableChunk
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +36,45 @@ except OSError:
         logger.exception("PDF export is not available due to WeasyPrint failing to import.")
 
 
+def render_pdf(html: str) -> bytes:
+    """Lay out and write a single report as a PDF. Run in a worker process by ExportPDF."""
+    return weasyprint.HTML(string=html).write_pdf()  # type: ignore[reportPossiblyUnboundVariable]
+
+
+def count_pages(html: str) -> int:
+    """Lay out a report and return its page count. Run in a worker process by ExportPDF."""
+    return len(weasyprint.HTML(string=html).render().pages)  # type: ignore[reportPossiblyUnboundVariable]
+
+
+def merge_pdfs(pdfs: list[bytes], filename: Path) -> None:
+    """Write PDFs one after another into a single file, keeping the first's metadata."""
+    writer = pypdf.PdfWriter(clone_from=io.BytesIO(pdfs[0]))
+    for pdf in pdfs[1:]:
+        writer.append(io.BytesIO(pdf))
+    writer.write(filename)
+
+
+class CleanHTMLSink:
+    """Text sink that cleans up HTML for web viewing as it is written to a file."""
+
+    def __init__(self, f: TextIO) -> None:
+        """Wrap an open text file."""
+        self.f = f
+
+    @staticmethod
+    def clean(html: str) -> str:
+        """Get rid of border-collapse for HTML (why?)."""
+        return html.replace("border-collapse: collapse", "border-collapse: initial")
+
+    def write(self, s: str, /) -> int:
+        """Write a cleaned string to the file."""
+        return self.f.write(self.clean(s))
+
+    def writelines(self, lines: Iterable[str], /) -> None:
+        """Write each cleaned string to the file."""
+        self.f.writelines(self.clean(line) for line in lines)
+
+
 class PaperworkExporter(ABC):
     """Virtual class for paperwork exports."""
 
@@ -47,26 +93,44 @@ class PaperworkExporter(ABC):
 
 
 class ExportHTML(PaperworkExporter):
-    """Class for HTML paperwork exports."""
+    """Class for HTML paperwork exports.
+
+    The HTML of each paperwork is kept so that repeated calls to `make` only
+        regenerate paperwork that was replaced in `self.paperwork` since the last call.
+        Paperwork with `stream_html` set is instead written straight to the file,
+        so its HTML is never held in memory.
+    """
 
     file_extension = "html"
 
+    def __init__(self, file_slug: str, paperwork: list[PaperworkGenerator]) -> None:
+        """Initialize filename, paperwork list, and HTML cache."""
+        super().__init__(file_slug, paperwork)
+        self._html: dict[PaperworkGenerator, str] = {}
+
     def generate_html(self) -> list[str]:
         """Generate HTML of each paperwork."""
-        html = []
-        html.extend(p.make_html() for p in self.paperwork)
+        self._html = {
+            p: self._html[p] if p in self._html else p.make_html() for p in self.paperwork
+        }
 
-        return html
+        return [self._html[p] for p in self.paperwork]
 
     def make(self) -> Path:
         """Make an HTML file with the provided paperwork."""
-        html = self.generate_html()
-        html = ["<!DOCTYPE html>\n<html>\n", *html, "</html>"]
+        self._html = {p: self._html[p] for p in self.paperwork if p in self._html}
         with self.filename.open("w") as f:
-            for h in html:
-                # Get rid of border-collapse for HTML (why?)
-                clean_html = h.replace("border-collapse: collapse", "border-collapse: initial")
-                f.write(clean_html)
+            sink = CleanHTMLSink(f)
+            sink.write("<!DOCTYPE html>\n<html>\n")
+            for p in self.paperwork:
+                if p in self._html:
+                    sink.write(self._html[p])
+                elif p.stream_html:
+                    p.write_html(sink)
+                else:
+                    self._html[p] = p.make_html()
+                    sink.write(self._html[p])
+            sink.write("</html>")
 
         return self.filename
 
@@ -77,48 +141,160 @@ class ExportPDF(ExportHTML):
     This uses `weasyprint` to generate PDFs, which is a HTML to PDF package.
     There's a lot of print-specific CSS attributes but they're pretty poorly supported
         by most webbrowsers; `weasyprint` is pretty good at them though.
+
+    Attributes:
+        jobs: Number of worker processes that lay out reports in parallel. With more
+            than one, each report is written as its own PDF and the PDFs are merged.
+        chunk_rows: With more than one job, split tables longer than this many rows
+            into chunks that are laid out in parallel, see :func:`chunk_table`
+
     """
 
     file_extension = "pdf"
 
+    def __init__(
+        self,
+        file_slug: str,
+        paperwork: list[PaperworkGenerator],
+        jobs: int = 1,
+        chunk_rows: int | None = None,
+    ) -> None:
+        """Initialize filename, paperwork list, and render caches."""
+        super().__init__(file_slug, paperwork)
+        self.jobs = jobs
+        self.chunk_rows = chunk_rows
+        self._documents: dict[PaperworkGenerator, weasyprint.Document] = {}  # type: ignore[reportPossiblyUnboundVariable]
+        self._pdfs: dict[PaperworkGenerator, list[bytes]] = {}
+
     def make(self) -> Path:
         """Make a PDF with the provided paperwork."""
         if "weasyprint" not in sys.modules:
             logger.critical("WeasyPrint was unable to be imported, PDF export is not possible.")
             raise RuntimeError("WeasyPrint not available")
 
+        if self.jobs > 1:
+            return self._make_parallel()
+
         html = self.generate_html()
-        documents = []
-        documents.extend(weasyprint.HTML(string=h).render() for h in html)  # type: ignore[reportPossiblyUnboundVariable]
+        self._documents = {
+            p: self._documents[p] if p in self._documents else weasyprint.HTML(string=h).render()  # type: ignore[reportPossiblyUnboundVariable]
+            for p, h in zip(self.paperwork, html, strict=True)
+        }
+        documents = [self._documents[p] for p in self.paperwork]
 
         # This method generates each report individually and collates them
         # Means that page numbers reset per report
         all_pages = [page for document in documents for page in document.pages]
 
-        documents[0].copy(all_pages).write_pdf(self.filename)
+        documents[0].copy(all_pages).write_pdf(self.filename)  # type: ignore[reportArgumentType]
         return self.filename
 
+    def _make_parallel(self) -> Path:
+        """Lay out reports in worker processes, then merge them in report order.
+
+        Laid out pages can't be sent between processes, so workers return finished PDFs.
+        Chunks of a long table are laid out once to count their pages, then again with
+            the page numbers of the whole table. The HTML of each chunk is only generated
+            once, and only its page number style is replaced for the second layout.
+        """
+        stale = [p for p in self.paperwork if p not in self._pdfs]
+        pdfs = {p: self._pdfs[p] for p in self.paperwork if p in self._pdfs}
+        if stale:
+            chunks = {p: self.chunk_table(p) for p in stale}
+            logger.info(
+                "Laying out %d report sections in %d processes",
+                sum(len(c) for c in chunks.values()),
+                self.jobs,
+            )
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                whole = {
+                    p: pool.submit(render_pdf, p.make_html()) for p in stale if len(chunks[p]) == 1
+                }
+                chunk_html = {
+                    p: [p.make_html(TableChunk(rows)) for rows in c]
+                    for p, c in chunks.items()
+                    if len(c) > 1
+                }
+                page_counts = {
+                    p: [pool.submit(count_pages, h) for h in html] for p, html in chunk_html.items()
+                }
+
+                chunked = {}
+                for p, futures in page_counts.items():
+                    counts = [f.result() for f in futures]
+                    first_pages = accumulate(counts[:-1], initial=1)
+                    unnumbered = p.page_number_style(TableChunk(slice(None)))
+                    chunked[p] = [
+                        pool.submit(
+                            render_pdf,
+                            html.replace(
+                                unnumbered,
+                                p.page_number_style(TableChunk(rows, first_page, sum(counts))),
+                                1,
+                            ),
+                        )
+                        for html, rows, first_page in zip(
+                            chunk_html.pop(p), chunks[p], first_pages, strict=True
+                        )
+                    ]
+
+                for p in stale:
+                    futures = [whole[p]] if p in whole else chunked[p]
+                    pdfs[p] = [f.result() for f in futures]
+
+        self._pdfs = pdfs
+        merge_pdfs([pdf for p in self.paperwork for pdf in self._pdfs[p]], self.filename)
+        return self.filename
+
+    def chunk_table(self, paperwork: PaperworkGenerator) -> list[slice]:
+        """Return the chunks of rows that a report is laid out in."""
+        if self.chunk_rows is None or not paperwork.chunkable:
+            return [slice(None)]
+
+        return paperwork.chunk_table(self.chunk_rows)
+
 
 class ExportExcel(PaperworkExporter):
-    """Class for Excel paperwork exports."""
+    """Class for Excel paperwork exports.
+
+    Attributes:
+        stream: Write each sheet's rows out as they are generated, with openpyxl's
+            write-only mode, instead of building the whole workbook in memory.
+            Cells share a few named styles instead of each having their own.
+
+    """
 
     file_extension = "xlsx"
 
+    def __init__(
+        self, file_slug: str, paperwork: list[PaperworkGenerator], *, stream: bool = False
+    ) -> None:
+        """Initialize filename, paperwork list, and Excel backend."""
+        super().__init__(file_slug, paperwork)
+        self.stream = stream
+
     def make(self) -> Path:
         """Make an Excel workbook with provided paperwork.
 
-        Note that the read/write buffer is the file, so each additional write/edit
-            will re-dump to the file. This is a consequence of how openpyxl is structured.
+        Every paperwork adds its sheets to the same in-memory workbook, which is only
+            written to the file once all of them are done. With `stream`, rows are
+            written out as they are generated instead.
         """
-        wb = Workbook()
-        wb.save(self.filename)
+        if self.stream:
+            return self._make_streaming()
 
-        for p in self.paperwork:
-            p.make_excel(str(self.filename))
+        with pd.ExcelWriter(self.filename, engine="openpyxl") as writer:
+            for p in self.paperwork:
+                p.make_excel(writer)
+
+        return self.filename
 
-        # Get rid of default first sheet
-        wb = openpyxl.load_workbook(self.filename)
-        del wb["Sheet"]
-        wb.save(self.filename)
+    def _make_streaming(self) -> Path:
+        """Make an Excel workbook, writing every sheet's rows as they are generated."""
+        workbook = Workbook(write_only=True)
+        styles = ExcelStyles(workbook)
+        for p in self.paperwork:
+            p.write_excel(workbook, styles)
+        workbook.save(self.filename)
 
         return self.filename
@@ -0,0 +1,252 @@
+"""Normalized show model shared by every paperwork generator.
+
+Every report is generated from the same Vectorworks export, and most of them need
+the same derived columns (ex. the combined instrument type and power). A ShowModel
+derives each column once, the first time any generator asks for it, and generators
+take projections of the result.
+"""
+
+import logging
+from collections.abc import Callable, Iterable
+from typing import ClassVar
+
+import numpy as np
+import pandas as pd
+
+from lighting_paperwork.helpers import DMXAddress, Gel, InstrumentPower, parse_frame_size
+
+logger = logging.getLogger(__name__)
+
+
+class ShowModel:
+    """A VW export along with the columns derived from it.
+
+    The model is never modified after a column is derived: projections are new
+        DataFrames, and the only change made to the export is adding fields that are
+        missing from it as blank columns.
+
+    Attributes:
+        derived_fields: The export fields that each derived column is computed from
+        no_color_text: What to show for an instrument without a gel
+
+    """
+
+    derived_fields: ClassVar[dict[str, tuple[str, ...]]] = {
+        "Instr Type & Load & Acc": (
+            "Instrument Type",
+            "Wattage",
+            "Accessory String",
+            "Accessory Flag",
+            "Channel",
+        ),
+        "Addr": ("Absolute Address",),
+        "Color & Gobo": ("Color", "Gobo 1", "Gobo 2", "Accessory Flag"),
+        "Parsed Frame Size": ("Frame Size",),
+    }
+    no_color_text = "N/C"
+
+    def __init__(self, vw_export: pd.DataFrame) -> None:
+        """Build a model of a VW export. Columns are derived when first projected."""
+        self._vw_export = vw_export.copy()
+        self._derived: dict[str, pd.Series] = {}
+        self._gels: pd.DataFrame | None = None
+
+    @property
+    def vw_export(self) -> pd.DataFrame:
+        """The VW export the model is built from. Do not modify."""
+        return self._vw_export
+
+    def verify_fields(self, fields: Iterable[str]) -> None:
+        """Verify certain fields exist in the export, adding any that are missing as blanks."""
+        for field in fields:
+            if field not in self._vw_export.columns:
+                logger.warning("Field `%s` not present in export", field)
+                logger.info(
+                    "In Spotlight Preferences > Lightwright, add `%s` to the export fields list.",
+                    field,
+                )
+                self._vw_export[field] = ""
+
+    def project(self, fields: list[str]) -> pd.DataFrame:
+        """Return a new DataFrame of export fields and derived columns, in the given order.
+
+        Args:
+            fields: Names of export fields, or of derived columns in `derived_fields`
+
+        """
+        self.verify_fields(f for f in fields if f not in self.derived_fields)
+        return pd.DataFrame(
+            {
+                field: self._derived_column(field)
+                if field in self.derived_fields
+                else self._vw_export[field]
+                for field in fields
+            },
+            index=self._vw_export.index,
+        )
+
+    def gels(self) -> pd.DataFrame:
+        """Return every physical gel in the export, see :func:`Gel.parse_gel`.
+
+        Returns:
+            A DataFrame with one row per gel and columns `Color`, `Sort`, and `Company`.
+                Its index is the index of the instrument in the export that the gel is in.
+
+        """
+        if self._gels is None:
+            self.verify_fields(["Color"])
+            rows = []
+            records = []
+            for idx, color in zip(
+                self._vw_export.index, self._vw_export["Color"].tolist(), strict=True
+            ):
+                for gel in Gel.parse_gel(color):
+                    rows.append(idx)
+                    records.append((gel.name, gel.name_sort, gel.company))
+
+            self._gels = pd.DataFrame.from_records(
+                records, index=pd.Index(rows), columns=["Color", "Sort", "Company"]
+            )
+
+        return self._gels.copy()
+
+    def _derived_column(self, name: str) -> pd.Series:
+        """Compute a derived column, or return it if it has already been computed."""
+        derivers: dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+            "Instr Type & Load & Acc": self.combine_instrtype,
+            "Addr": self.format_address_slash,
+            "Color & Gobo": self.combine_gelgobo,
+            "Parsed Frame Size": self.parse_frame_sizes,
+        }
+
+        if name not in self._derived:
+            self.verify_fields(self.derived_fields[name])
+            self._derived[name] = derivers[name](self._vw_export)
+
+        return self._derived[name]
+
+    @staticmethod
+    def determine_power(df: pd.DataFrame) -> pd.Series:
+        """Determine each instrument's power from the Instrument Type and Wattage fields.
+
+        When the fields disagree, the values from the Wattage field takes priority.
+        When either field shows 0W, the other field will take priority.
+
+        Exports only contain a handful of distinct power strings, so each distinct
+            string is parsed once and the per-row decision is made with masks.
+
+        Args:
+            df: Dataframe that must have a "Wattage", "Instrument Type", "Channel",
+                and "Accessory Flag" column.
+
+        Returns:
+            The formatted power of each instrument, or an empty string if neither
+                field has a power.
+
+        """
+        # Collect potential powers
+        wattage_codes, wattage_uniques = pd.factorize(df["Wattage"])
+        wattage_powers = [InstrumentPower(i) for i in wattage_uniques]
+        wattage_values = np.array([i.power for i in wattage_powers], dtype=object)[wattage_codes]
+        wattage_formatted = np.array([i.format() for i in wattage_powers], dtype=object)[
+            wattage_codes
+        ]
+
+        # Unmatched instrument types are coded -1, so put 0W at the end of the lookup
+        type_codes, type_uniques = pd.factorize(
+            df["Instrument Type"].str.extract(f"({InstrumentPower.POWER_REGEX})", expand=False)
+        )
+        type_powers = [*(InstrumentPower(i) for i in type_uniques), InstrumentPower(0)]
+        type_values = np.array([i.power for i in type_powers], dtype=object)[type_codes]
+        type_formatted = np.array([i.format() for i in type_powers], dtype=object)[type_codes]
+
+        # Verify which we should use
+        wattage_empty = wattage_values == 0
+        type_empty = type_values == 0
+        no_power = wattage_empty & type_empty
+        # Fields disagree, prefer the wattage field
+        conflicting = ~wattage_empty & ~type_empty & (wattage_values != type_values)
+        # There was a power in the instrument type field but none in the wattage field
+        use_type = wattage_empty & ~type_empty
+
+        # Warn in row order
+        channels = df["Channel"].to_numpy()
+        instrument_types = df["Instrument Type"].to_numpy()
+        efficient = no_power & (df["Accessory Flag"] != "1").to_numpy()
+        for i in np.flatnonzero(efficient | conflicting):
+            if efficient[i]:
+                logger.warning(
+                    "Channel %s is infinitely efficient (%s is %s)",
+                    channels[i],
+                    instrument_types[i],
+                    wattage_formatted[i],
+                )
+            else:
+                logger.warning(
+                    "Channel %s has conflicting power values (%s, %s). Using %s.",
+                    channels[i],
+                    wattage_formatted[i],
+                    type_formatted[i],
+                    wattage_formatted[i],
+                )
+
+        power = np.where(use_type, type_formatted, wattage_formatted)
+        power[no_power] = ""
+        return pd.Series(power, index=df.index, dtype=str)
+
+    @staticmethod
+    def combine_instrtype(df: pd.DataFrame) -> pd.Series:
+        """Combine the Instrument Type and Power and Accessory fields into one."""
+        instrtype = df["Instrument Type"]
+        power = ShowModel.determine_power(df)
+
+        # Make sure power shows up once, after the instrument type
+        instload = instrtype.str.strip().where(
+            power == "",
+            # Remove from instrument type (if existing)
+            instrtype.str.replace(InstrumentPower.POWER_REGEX, "", regex=True).str.strip()
+            + " "
+            + power,
+        )
+
+        # If accessory, add that here
+        accessories = df["Accessory String"]
+        return instload.where(accessories == "", instload + ", " + accessories)
+
+    @staticmethod
+    def combine_gelgobo(df: pd.DataFrame) -> pd.Series:
+        """Combine the Gel and Gobo fields into one."""
+        color = df["Color"]
+        gobo1 = df["Gobo 1"]
+        gobo2 = df["Gobo 2"]
+
+        # If no gel replace with N/C
+        gelgobo = color.mask(
+            color == "", np.where(df["Accessory Flag"] == "1", "", ShowModel.no_color_text)
+        )
+
+        # Append gobo if exists
+        gobos = gobo1.mask((gobo1 != "") & (gobo2 != ""), gobo1 + ", " + gobo2).mask(
+            gobo1 == "", gobo2
+        )
+        return gelgobo.mask(gobos != "", gelgobo + ", T: " + gobos)  # type: ignore[reportReturnType]
+
+    @staticmethod
+    def format_address_slash(df: pd.DataFrame) -> pd.Series:
+        """Format an absolute address into a Universe/Address string.
+
+        Returns:
+            The formatted address of each instrument, or an empty string if it has none.
+
+        """
+        absaddr = df["Absolute Address"].to_numpy(dtype=object).astype(np.int64)
+
+        addr = np.full(len(absaddr), "", dtype=object)
+        assigned = absaddr != 0
+        addr[assigned] = DMXAddress.format_slash_conditional_array(absaddr[assigned])
+        return pd.Series(addr, index=df.index, dtype=str)
+
+    @staticmethod
+    def parse_frame_sizes(df: pd.DataFrame) -> pd.Series:
+        """Parse the Frame Size field, see :func:`parse_frame_size`."""
+        return df["Frame Size"].map(parse_frame_size).astype(str)  # type: ignore[reportReturnType]
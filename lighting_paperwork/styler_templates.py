@@ -0,0 +1,90 @@
+"""Registry of compiled Styler templates.
+
+`Styler.from_custom_template` builds a new Jinja environment and compiles the template
+every time it is called, which adds up when a Styler is made for every report and
+every instrument schedule position. Templates are instead compiled once per process,
+and can also be cached on disk as Jinja bytecode between runs.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Self, override
+
+import jinja2
+from pandas.io.formats.style import Styler
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+DEFAULT_TEMPLATE = "header_footer.tpl"
+
+
+class PaperworkStyler(Styler):
+    """A Styler that can also add CSS classes to the rows of the table body.
+
+    Row classes are only rendered by templates that override the `tr` block, such as
+        `header_footer.tpl`.
+
+    Attributes:
+        tr_classes: CSS classes of each body row, or None to leave rows unclassed
+
+    """
+
+    tr_classes: list[str] | None = None
+
+    def set_tr_classes(self, classes: list[str]) -> Self:
+        """Add CSS classes to the rows of the table body, one string per row."""
+        self.tr_classes = classes
+        return self
+
+    @override
+    def _copy(self, deepcopy: bool = False) -> Styler:
+        # Rendering works on a copy, which has to keep the row classes
+        styler = super()._copy(deepcopy=deepcopy)
+        styler.tr_classes = self.tr_classes  # type: ignore[reportAttributeAccessIssue]
+        return styler
+
+    @override
+    def _render_html(self, *args: Any, **kwargs: Any) -> str:
+        return super()._render_html(*args, tr_classes=self.tr_classes, **kwargs)
+
+
+class StylerTemplates:
+    """Compiled Styler subclasses, one per custom table template.
+
+    Attributes:
+        env: The Jinja environment shared by every template, equivalent to the one
+            `Styler.from_custom_template` creates
+
+    """
+
+    def __init__(self, searchpath: Path = TEMPLATE_DIR) -> None:
+        """Set up the shared Jinja environment."""
+        loader = jinja2.ChoiceLoader([jinja2.FileSystemLoader(str(searchpath)), Styler.loader])
+        self.env = jinja2.Environment(loader=loader)  # noqa: S701
+        self._stylers: dict[str, type[PaperworkStyler]] = {}
+
+    def enable_bytecode_cache(self, cache_dir: Path) -> None:
+        """Store compiled templates in `cache_dir` so later runs skip compilation."""
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.env.bytecode_cache = jinja2.FileSystemBytecodeCache(str(cache_dir))
+        logger.debug("Caching compiled templates in %s", cache_dir)
+
+    def styler(self, html_table: str = DEFAULT_TEMPLATE) -> type[PaperworkStyler]:
+        """Return a Styler subclass that renders tables with the `html_table` template.
+
+        The template is only loaded and compiled the first time it is requested.
+        """
+        if html_table not in self._stylers:
+            env = self.env
+
+            class TemplateStyler(PaperworkStyler):
+                template_html_table = env.get_template(html_table)
+
+            TemplateStyler.env = env
+            self._stylers[html_table] = TemplateStyler
+
+        return self._stylers[html_table]
+
+
+styler_templates = StylerTemplates()
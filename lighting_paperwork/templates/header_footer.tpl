@@ -13,6 +13,25 @@
 {{ super() }}
 {% endblock before_head_rows %}
 
+{% block tr scoped %}
+{% if exclude_styles %}
+    <tr>
+{% for c in r %}{% if c.is_visible != False %}
+      <{{c.type}} {{c.attributes}}>{{c.display_value}}</{{c.type}}>
+{% endif %}{% endfor %}
+{% else %}
+{% if tr_classes and tr_classes[loop.index0] %}
+    <tr class="{{ tr_classes[loop.index0] }}">
+{% else %}
+    <tr>
+{% endif %}
+{% for c in r %}{% if c.is_visible != False %}
+      <{{c.type}} {%- if c.id is defined %} id="T_{{uuid}}_{{c.id}}" {%- endif %} class="{{c.class}}" {{c.attributes}}>{{c.display_value}}</{{c.type}}>
+{% endif %}{% endfor %}
+{% endif %}
+    </tr>
+{% endblock tr %}
+
 {% block tbody %}
 {{ super() }}
 {% block tfoot %}
@@ -1,9 +1,17 @@
 """Tools for importing data from a Vectorworks Data Exchange XML file."""
 
+import hashlib
 import logging
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Self
 from xml.etree import ElementTree as ET
 
+import numpy as np
 import pandas as pd
+from defusedxml.ElementTree import fromstring as defusedxml_fromstring
+from defusedxml.ElementTree import iterparse as defusedxml_iterparse
 from defusedxml.ElementTree import parse as defusedxml_parse
 
 logger = logging.getLogger(__name__)
@@ -14,13 +22,15 @@ class VWAccessory:
 
     Attributes:
         node_uid: The UID of the accessory
+        parent_uid: The UID of the instrument the accessory is attached to, if any
         props: Dict of properties related to the accessory
 
     """
 
-    def __init__(self, node: ET.Element) -> None:
+    def __init__(self, node: ET.Element, parent_uid: str | None = None) -> None:
         """Create an accessory from an Accessory-type XML node."""
         self.node_uid: str = node.tag
+        self.parent_uid = parent_uid
         self.props: dict[str, str] = {}
         for element in node:
             if element.text:
@@ -53,7 +63,7 @@ class VWInstrument:
             elif element.tag == "Accessories":
                 # Parse accessories if any
                 for acc in element:
-                    self.accs.append(VWAccessory(acc))
+                    self.accs.append(VWAccessory(acc, self.node_uid))
             else:
                 # discard if no data in element
                 pass
@@ -64,6 +74,9 @@ class VWExport:
 
     Attributes:
         instruments: List of VWInstruments from the XML file
+        accessories: Child table of every VWAccessory attached to an instrument,
+            linked back to its instrument by `parent_uid`
+        accessory_devices: Smart accessories that get their own paperwork entry
         field_mapping: Mapping of XML tags to "pretty" descriptions
         export_time: Timestamp of the XML export
         vw_version: VW version that generated the XML export
@@ -71,19 +84,65 @@ class VWExport:
 
     """
 
-    def __init__(self, filename: str) -> None:
+    def __init__(self, filename: str, *, streaming: bool = True) -> None:
         """Parse an VW XML export into Python objects.
 
         Args:
             filename: A valid filename to a XML export
+            streaming: Incrementally parse the export, discarding each XML node once
+                it has been ingested. Keeps peak memory bounded for very large plots.
+                Otherwise, the entire tree is loaded before it is ingested.
 
         """
-        self.instruments: list[VWInstrument] = []
-        self.field_mapping = {}
+        self._init_state()
 
         if ".xml" not in filename:
             raise ValueError(f"Invalid filetype for VW import (got {filename}, expected *.xml)")
 
+        if streaming:
+            self._parse_stream(filename)
+        else:
+            self._parse_tree(filename)
+        self.resolve_accessories()
+
+        logger.debug("VW export generated at %s", self.export_time)
+        logger.debug("Importing from VW version %s build %s", self.vw_version, self.vw_build)
+        logger.info("Imported %s instruments", len(self.instruments))
+
+    @classmethod
+    def from_elements(cls, field_list: ET.Element, instrument_data: Iterable[ET.Element]) -> Self:
+        """Build an export from already-parsed XML nodes instead of a file.
+
+        Args:
+            field_list: The ExportFieldList node
+            instrument_data: Children of the InstrumentData node to ingest. May be a subset.
+
+        """
+        export = cls.__new__(cls)
+        export._init_state()  # noqa: SLF001
+        export.parse_field_list(field_list)
+        for instr in instrument_data:
+            export.parse_instrument(instr)
+        export.resolve_accessories()
+
+        return export
+
+    def _init_state(self) -> None:
+        """Set up empty ingestion state."""
+        self.instruments: list[VWInstrument] = []
+        self.accessories: list[VWAccessory] = []
+        self.accessory_devices: list[VWAccessory] = []
+        self.field_mapping = {}
+        self.export_time: str | None = None
+        self.vw_version: str | None = None
+        self.vw_build: str | None = None
+        # Major UID -> most recent instrument with that UID, for accessory lookups
+        self._uid_index: dict[str, VWInstrument] = {}
+        # Accessories whose parent had not been ingested yet, as (accessory, fallback)
+        self._unresolved_accs: list[tuple[VWAccessory, VWInstrument]] = []
+
+    def _parse_tree(self, filename: str) -> None:
+        """Parse an XML export by loading the entire tree into memory."""
         tree = defusedxml_parse(filename)
         root = tree.getroot()
 
@@ -93,13 +152,7 @@ class VWExport:
         mapping_data = root.find("ExportFieldList")
         if mapping_data is None:
             raise RuntimeError("Unable to find ExportFieldList")
-        for field in mapping_data:
-            if field.tag == "TimeStamp":
-                self.export_time = field.text
-            elif field.tag == "AppStamp":
-                continue
-            else:
-                self.field_mapping[field.tag] = field.text
+        self.parse_field_list(mapping_data)
 
         instrument_data = root.find("InstrumentData")
         if instrument_data is None:
@@ -107,9 +160,51 @@ class VWExport:
         for instr in instrument_data:
             self.parse_instrument(instr)
 
-        logger.debug("VW export generated at %s", self.export_time)
-        logger.debug("Importing from VW version %s build %s", self.vw_version, self.vw_build)
-        logger.info("Imported %s instruments", len(self.instruments))
+    def _parse_stream(self, filename: str) -> None:
+        """Parse an XML export incrementally.
+
+        Each child of InstrumentData is ingested as soon as its closing tag is read,
+            then cleared and detached so that only one instrument node is alive at a time.
+        """
+        found_mapping = False
+        found_instruments = False
+        instrument_data: ET.Element | None = None
+        depth = 0
+        for event, node in defusedxml_iterparse(filename, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2 and node.tag == "InstrumentData":
+                    instrument_data = node
+                    found_instruments = True
+                continue
+
+            depth -= 1
+            if depth == 1:
+                # End of a top-level section
+                if node.tag == "ExportFieldList":
+                    self.parse_field_list(node)
+                    found_mapping = True
+                instrument_data = None
+                node.clear()
+            elif depth == 2 and instrument_data is not None:
+                self.parse_instrument(node)
+                node.clear()
+                instrument_data.remove(node)
+
+        if not found_mapping:
+            raise RuntimeError("Unable to find ExportFieldList")
+        if not found_instruments:
+            raise RuntimeError("Unable to find InstrumentData")
+
+    def parse_field_list(self, mapping_data: ET.Element) -> None:
+        """Parse the ExportFieldList node into the field mapping and export metadata."""
+        for field in mapping_data:
+            if field.tag == "TimeStamp":
+                self.export_time = field.text
+            elif field.tag == "AppStamp":
+                continue
+            else:
+                self.field_mapping[field.tag] = field.text
 
     def parse_instrument(self, instr: ET.Element) -> None:
         """Parse an XML node into an instrument or metadata."""
@@ -124,21 +219,54 @@ class VWExport:
             )
         if "UID" in instr.tag:
             new_instrument = VWInstrument(instr)
+            self.accessories.extend(new_instrument.accs)
 
             if new_instrument.props["Device_Type"] == "Accessory":
-                # ok so typically the parent is right behind it, so we check
-                # more on UIDs to do this cleanly later:
+                # Typically the parent is right behind it, but look it up by UID so
+                # order doesn't matter. More on UIDs:
                 # https://forum.vectorworks.net/index.php?/topic/
                 #   24673-why-do-my-uids-keep-changing/&do=findComment&comment=117429
-                if new_instrument.node_uid.split("_")[1] in self.instruments[-1].node_uid:
-                    # If major UID numbers match, then that's good enough lol
-                    self.instruments[-1].accs.append(VWAccessory(instr))
+                acc = VWAccessory(instr)
+                parent = self._uid_index.get(self.major_uid(new_instrument.node_uid))
+                if parent is not None:
+                    self.attach_accessory(parent, acc)
                 else:
-                    logger.info("%s is an orphaned accessory", instr.tag)
+                    # Parent might show up later in the export, sort it out once it's all in
+                    self._unresolved_accs.append((acc, new_instrument))
                     self.instruments.append(new_instrument)
             else:
+                self._uid_index[self.major_uid(new_instrument.node_uid)] = new_instrument
                 self.instruments.append(new_instrument)
 
+    @staticmethod
+    def major_uid(node_uid: str) -> str:
+        """Return the major UID number of a node (ex. `1005` for `UID_1005_1_1_1_1`)."""
+        return node_uid.split("_")[1]
+
+    def attach_accessory(self, parent: VWInstrument, acc: VWAccessory) -> None:
+        """Link an accessory to its parent instrument."""
+        acc.parent_uid = parent.node_uid
+        parent.accs.append(acc)
+        self.accessories.append(acc)
+
+    def resolve_accessories(self) -> None:
+        """Attach accessories that were ingested before their parent instrument.
+
+        Accessories that still have no parent are left in place as orphaned instruments.
+        """
+        adopted: set[int] = set()
+        for acc, fallback in self._unresolved_accs:
+            parent = self._uid_index.get(self.major_uid(acc.node_uid))
+            if parent is None:
+                logger.info("%s is an orphaned accessory", acc.node_uid)
+                continue
+            self.attach_accessory(parent, acc)
+            adopted.add(id(fallback))
+
+        if adopted:
+            self.instruments = [i for i in self.instruments if id(i) not in adopted]
+        self._unresolved_accs = []
+
     def handle_accessories(
         self, filterlist: tuple[str, ...] = (), fuzzyfilterlist: tuple[str, ...] = ("C-Clamp",)
     ) -> None:
@@ -147,7 +275,8 @@ class VWExport:
         Adds accessories to a AccessoryString, and if the accessory is smart, make
             a separate "special" instrument with AccessoryFlag prop set.
 
-        Mutates the existing instruments list to add these accessories
+        The instruments list is left untouched; smart accessories that need their own
+            entry are collected into `self.accessory_devices` instead.
 
         Args:
             filterlist: a list of exact matches for accessories that should be omitted.
@@ -158,8 +287,6 @@ class VWExport:
             None
 
         """
-        # TODO(eosti): self.instruments really shouldn't be mutable
-        # https://github.com/eosti/lighting-paperwork/issues/11
         self.field_mapping["AccessoryString"] = "Accessory String"
         self.field_mapping["AccessoryFlag"] = "Accessory Flag"
         additional_accs = []
@@ -198,8 +325,7 @@ class VWExport:
 
             instr.props["AccessoryString"] = namestr
 
-        # do this last to prevent recursive conversion
-        self.instruments += additional_accs
+        self.accessory_devices = additional_accs
 
     def export_df(self) -> pd.DataFrame:
         """Convert ingested data into a DataFrame.
@@ -213,7 +339,7 @@ class VWExport:
         header.extend(str(v) for v in self.field_mapping.values())
 
         all_instr = []
-        for instr in self.instruments:
+        for instr in [*self.instruments, *self.accessory_devices]:
             if instr.props["Action"] == "Delete":
                 # Don't export deleted instruments
                 continue
@@ -223,3 +349,190 @@ class VWExport:
             all_instr.append(row)
 
         return pd.DataFrame(all_instr, columns=header)
+
+
+class IncrementalVWExport:
+    """Vectorworks XML ingester that only re-parses the instruments that changed.
+
+    Vectorworks rewrites the entire Data Exchange file whenever the drawing changes.
+    Each top-level UID element is fingerprinted by its raw bytes, so a refresh only
+    parses the device groups (instruments and accessories sharing a major UID) that
+    were added, removed, or changed, and patches the previous DataFrame with them.
+
+    Attributes:
+        filename: The XML export being tracked
+        df: DataFrame equivalent to :func:`VWExport.export_df` for the latest refresh
+        field_mapping: Mapping of XML tags to "pretty" descriptions
+        export_time: Timestamp of the XML export
+        vw_version: VW version that generated the XML export
+        vw_build: VW build that generated the XML export
+        fingerprints: Hash of each UID element's bytes, in document order
+        changed_uids: UIDs that were added, removed, or changed by the last refresh
+
+    """
+
+    UID_OPEN_REGEX = re.compile(rb"<(UID_[^\s/>]+)>")
+    INSTRUMENT_DATA_REGEX = re.compile(
+        rb"<InstrumentData(?:\s[^>]*)?>(.*)</InstrumentData\s*>", re.DOTALL
+    )
+
+    def __init__(self, filename: str) -> None:
+        """Run an initial full ingestion of an export.
+
+        Args:
+            filename: A valid filename to a XML export
+
+        """
+        if ".xml" not in filename:
+            raise ValueError(f"Invalid filetype for VW import (got {filename}, expected *.xml)")
+
+        self.filename = filename
+        self.df: pd.DataFrame = pd.DataFrame()
+        self.field_mapping: dict[str, str] = {}
+        self.export_time: str | None = None
+        self.vw_version: str | None = None
+        self.vw_build: str | None = None
+        self.fingerprints: dict[str, bytes] = {}
+        self.changed_uids: set[str] = set()
+        # Field mapping before accessory fields are added, to detect field list changes
+        self._source_fields: dict[str, str] = {}
+        # Node Tag of each smart accessory row -> UID of its parent instrument
+        self._row_parents: dict[str, str] = {}
+
+        self.refresh()
+
+    @classmethod
+    def split_export(cls, data: bytes) -> tuple[bytes, dict[str, bytes]]:
+        """Split raw export bytes into a skeleton and top-level UID elements.
+
+        Returns:
+            A tuple of (the export with every top-level UID element removed,
+                dict of UID -> raw bytes of that element, in document order).
+
+        """
+        instrument_data = cls.INSTRUMENT_DATA_REGEX.search(data)
+        if instrument_data is None:
+            return data, {}
+
+        skeleton = [data[: instrument_data.start(1)]]
+        elements: dict[str, bytes] = {}
+        pos = instrument_data.start(1)
+        end = instrument_data.end(1)
+        while (match := cls.UID_OPEN_REGEX.search(data, pos, end)) is not None:
+            # Searching from the end of each element skips nested accessory UIDs
+            close_tag = b"</" + match.group(1) + b">"
+            close = data.find(close_tag, match.end(), end)
+            if close == -1:
+                raise RuntimeError(f"Unterminated element {match.group(1).decode()}")
+            skeleton.append(data[pos : match.start()])
+            elements[match.group(1).decode()] = data[match.start() : close + len(close_tag)]
+            pos = close + len(close_tag)
+        skeleton.append(data[pos:])
+
+        return b"".join(skeleton), elements
+
+    def refresh(self) -> pd.DataFrame:
+        """Re-read the export, rebuilding only the device groups that changed.
+
+        Returns:
+            The updated DataFrame (also stored as `self.df`).
+
+        """
+        data = Path(self.filename).read_bytes()
+        skeleton, elements = self.split_export(data)
+
+        root = defusedxml_fromstring(skeleton)
+        field_list = root.find("ExportFieldList")
+        if field_list is None:
+            raise RuntimeError("Unable to find ExportFieldList")
+        instrument_data = root.find("InstrumentData")
+        if instrument_data is None:
+            raise RuntimeError("Unable to find InstrumentData")
+        metadata = list(instrument_data)
+
+        header = VWExport.from_elements(field_list, metadata)
+        self.export_time = header.export_time
+        self.vw_version = header.vw_version
+        self.vw_build = header.vw_build
+
+        fingerprints = {
+            uid: hashlib.blake2b(element, digest_size=16).digest()
+            for uid, element in elements.items()
+        }
+        full_rebuild = header.field_mapping != self._source_fields
+        if full_rebuild:
+            self.changed_uids = set(fingerprints) | set(self.fingerprints)
+        else:
+            self.changed_uids = {
+                uid for uid, fp in fingerprints.items() if self.fingerprints.get(uid) != fp
+            } | (self.fingerprints.keys() - fingerprints.keys())
+        reordered = list(fingerprints) != list(self.fingerprints)
+        self._source_fields = dict(header.field_mapping)
+        self.fingerprints = fingerprints
+
+        if not self.changed_uids and not reordered:
+            logger.debug("No instruments changed in %s", self.filename)
+            return self.df
+
+        groups = {VWExport.major_uid(uid) for uid in self.changed_uids}
+        # Reordering alone only needs the rows sorted
+        if full_rebuild or groups:
+            if full_rebuild:
+                # Parsing in one go is much faster than element-by-element
+                full_data = defusedxml_fromstring(data).find("InstrumentData")
+                if full_data is None:
+                    raise RuntimeError("Unable to find InstrumentData")
+                partial = VWExport.from_elements(field_list, full_data)
+            else:
+                partial = VWExport.from_elements(
+                    field_list,
+                    [
+                        *metadata,
+                        *(
+                            defusedxml_fromstring(element)
+                            for uid, element in elements.items()
+                            if VWExport.major_uid(uid) in groups
+                        ),
+                    ],
+                )
+            rows = partial.export_df()
+            self.field_mapping = partial.field_mapping
+
+            if full_rebuild:
+                self.df = rows
+                self._row_parents = {}
+            else:
+                stale = self.df["Node Tag"].str.split("_").str[1].isin(groups)
+                self._row_parents = {
+                    tag: parent
+                    for tag, parent in self._row_parents.items()
+                    if VWExport.major_uid(tag) not in groups
+                }
+                self.df = pd.concat([self.df[~stale], rows], ignore_index=True)  # type: ignore[reportAttributeAccessIssue]
+            self._row_parents.update(
+                (acc.node_uid, acc.parent_uid)
+                for acc in partial.accessory_devices
+                if acc.parent_uid is not None
+            )
+
+        self._sort_rows(list(elements))
+        logger.info(
+            "Refreshed %s instruments (%s device groups changed)", len(self.df), len(groups)
+        )
+        return self.df
+
+    def _sort_rows(self, uid_order: list[str]) -> None:
+        """Sort rows into the same order as :func:`VWExport.export_df`.
+
+        Instruments come first in document order, followed by smart accessories
+            ordered by their parent instrument.
+        """
+        position = pd.Series(np.arange(len(uid_order)), index=uid_order)
+        tags = self.df["Node Tag"]
+        parents = tags.map(self._row_parents)  # type: ignore[reportArgumentType]
+        is_accessory = parents.notna().to_numpy()
+        own_pos = tags.map(position).to_numpy()  # type: ignore[reportArgumentType]
+        group_pos = np.where(is_accessory, parents.map(position).to_numpy(), own_pos)  # type: ignore[reportArgumentType]
+
+        order = np.lexsort((own_pos, group_pos, is_accessory))
+        self.df = self.df.iloc[order].reset_index(drop=True)
@@ -13,6 +13,12 @@ def pytest_configure(config):  # noqa: ARG001
     pytest.NUM_POSITIONS = 16
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch, tmp_path):
+    # Keep the export cache out of the user's real cache directory
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+
+
 @pytest.fixture
 def vwx_export_file():
     return "./tests/TestFile.xml"
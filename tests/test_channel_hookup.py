@@ -2,10 +2,13 @@
 """Tests for the ChannelHookup generator."""
 
 import logging
+from itertools import pairwise
 
+import pandas as pd
 import pytest
 
 from lighting_paperwork.channel_hookup import ChannelHookup
+from lighting_paperwork.paperwork import TableChunk
 
 
 def test_parse_channel_hookup(caplog, vwx_export):
@@ -146,3 +149,73 @@ def test_parse_channel_hookup(caplog, vwx_export):
     lx = paperwork.df.loc[paperwork.df["Chan"] == "37"]
     assert len(lx) == 1
     assert lx.iloc[0]["Color & Gobo"] == "L201x2, T: GAM 636-Construction B, R77405"
+
+
+def test_repeated_index_val():
+    paperwork = ChannelHookup(pd.DataFrame())
+    paperwork.df = pd.DataFrame(
+        {
+            "Chan": ["1", "1", "1", "2", "2", "3"],
+            "U#": ["1", "1", "2", "4", "4", "4"],
+            "Position": ["FOH", "FOH", "FOH", "FOH", "LX1", "LX1"],
+            "Purpose": ["", "", "Wash", " ", " ", " "],
+        }
+    )
+    paperwork.repeated_index_val()
+
+    assert paperwork.df.to_dict("list") == {
+        "Chan": ["1", "&nbsp;", "&nbsp;", "2", "&nbsp;", "3"],
+        "U#": ["1", "1", "2", "4", "4", "4"],
+        "Position": ["FOH", '"', '"', "FOH", "LX1", "LX1"],
+        "Purpose": ["", "", "Wash", " ", " ", " "],
+    }
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 4, 15, 1000])
+def test_chunk_table(vwx_export, chunk_rows):
+    paperwork = ChannelHookup(vwx_export)
+    chunks = paperwork.chunk_table(chunk_rows)
+    empty_str = paperwork.formatting_quirks.empty_str
+
+    # Every row is in exactly one chunk, in order
+    assert chunks[0].start == 0
+    assert chunks[-1].stop == len(paperwork.df)
+    assert all(a.stop == b.start for a, b in pairwise(chunks))
+
+    for chunk in chunks:
+        rows = paperwork.df.iloc[chunk]
+        # Never split a repeated channel from the rows above it
+        assert rows["Chan"].iloc[0] != empty_str
+        # Only a single run may be longer than the chunk
+        assert len(rows) <= chunk_rows or (rows["Chan"].iloc[1:] == empty_str).all()
+
+
+def test_chunk_html(vwx_export):
+    paperwork = ChannelHookup(vwx_export)
+    first, second = paperwork.chunk_table(30)[:2]
+
+    first_html = paperwork.make_html(TableChunk(first, 1, 7))
+    assert "bookmark-label" in first_html
+    assert "counter-reset" not in first_html
+    assert 'counter(page) " of " "7"' in first_html
+
+    second_html = paperwork.make_html(TableChunk(second, 5, 7))
+    assert "bookmark-label" not in second_html
+    assert "@page :first { counter-reset: page 5; }" in second_html
+    # Header, column names, and footer rows
+    assert second_html.count("<tr") == second.stop - second.start + 3
+
+
+def test_chunk_page_number_style(vwx_export):
+    paperwork = ChannelHookup(vwx_export)
+    second = paperwork.chunk_table(30)[1]
+
+    html = paperwork.make_html(TableChunk(second))
+    unnumbered = paperwork.page_number_style(TableChunk(second))
+    assert html.count(unnumbered) == 1
+    assert "counter(pages)" not in html.replace(unnumbered, "")
+
+    numbered = html.replace(unnumbered, paperwork.page_number_style(TableChunk(second, 5, 7)))
+    assert "@page :first { counter-reset: page 5; }" in numbered
+    assert 'counter(page) " of " "7"' in numbered
+    assert "counter(pages)" not in numbered
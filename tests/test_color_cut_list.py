@@ -1,5 +1,7 @@
 """Tests for the color cut list generator."""
 
+import pytest
+
 from lighting_paperwork.color_cut_list import ColorCutList
 
 
@@ -64,3 +66,44 @@ def test_parse_color_cut_list(vwx_export):
     assert len(r124) == 1
     assert r124.iloc[0]["Frame Size"] == '16"x12.2"'
     assert r124.iloc[0]["Count"] == 1
+
+
+def test_style_color_cut_list(vwx_export):
+    paperwork = ColorCutList(vwx_export).generate_df()
+    style = ColorCutList.style_data(
+        paperwork.df,
+        body_style=paperwork.style.body,
+        col_width=list(paperwork.col_widths),
+        border_weight=1.0,
+        quirks=paperwork.formatting_quirks,
+    )
+
+    assert style.shape == paperwork.df.shape
+    colors = paperwork.df["Color"]
+    for pos, (color, css) in enumerate(zip(colors, style["Color"], strict=True)):
+        # Repeated colors are hidden and not separated by a border
+        assert ("color: transparent; " in css) == (pos > 0 and color == colors.iloc[pos - 1])
+        is_next_same = pos + 1 < len(colors) and color == colors.iloc[pos + 1]
+        assert ("border-bottom: none; " in css) == is_next_same
+    assert all("border-bottom: none; " not in css for css in style["Frame Size"])
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 5, 13])
+def test_chunk_color_runs(vwx_export, chunk_rows):
+    paperwork = ColorCutList(vwx_export)
+    chunks = paperwork.chunk_table(chunk_rows)
+    colors = paperwork.df["Color"]
+    # R02 and R119 each span two rows, which these chunk sizes would split
+    assert colors.iloc[4] == colors.iloc[5]
+    assert colors.iloc[12] == colors.iloc[13]
+
+    assert chunks[0].start == 0
+    assert chunks[-1].stop == len(colors)
+    whole_css = ColorCutList.style_data(paperwork.df, **paperwork.style_params())
+    for chunk in chunks:
+        # Never split a run of the same color
+        if chunk.start > 0:
+            assert colors.iloc[chunk.start] != colors.iloc[chunk.start - 1]
+        # Each chunk styles like the same rows of the whole table
+        chunk_css = ColorCutList.style_data(paperwork.df.iloc[chunk], **paperwork.style_params())
+        assert chunk_css.equals(whole_css.iloc[chunk])
@@ -0,0 +1,78 @@
+# type: ignore[reportAttributeAccessIssue]
+"""Tests for the parsed export cache."""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from lighting_paperwork import export_cache
+from lighting_paperwork.export_cache import ExportCache, load_vw_export
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExportCache(tmp_path / "cache")
+
+
+def test_cache_roundtrip(cache, vwx_export_file):
+    parsed = load_vw_export(vwx_export_file, cache)
+    assert len(list(cache.cache_dir.glob("*.npz"))) == 1
+
+    cached = cache.load(cache.key(vwx_export_file))
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached.df, parsed.df)
+    assert cached.field_mapping == parsed.field_mapping
+    assert cached.export_time == parsed.export_time
+    assert cached.vw_version == parsed.vw_version
+    assert cached.vw_build == parsed.vw_build
+
+
+def test_cache_skips_parsing(monkeypatch, cache, vwx_export_file):
+    load_vw_export(vwx_export_file, cache)
+
+    def fail_parse(*_args, **_kwargs):
+        raise AssertionError("XML should not be parsed on a cache hit")
+
+    monkeypatch.setattr(export_cache, "VWExport", fail_parse)
+    load_vw_export(vwx_export_file, cache)
+
+
+def test_cache_invalidated_by_change(tmp_path, cache, vwx_export_file):
+    export_file = tmp_path / "Show.xml"
+    shutil.copy(vwx_export_file, export_file)
+    first_key = cache.key(export_file)
+
+    stat = export_file.stat()
+    os.utime(export_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.key(export_file) != first_key
+
+    with export_file.open("a") as f:
+        f.write("\n")
+    assert cache.key(export_file) != first_key
+
+
+def test_cache_eviction(cache, vwx_export_file):
+    export = load_vw_export(vwx_export_file, cache)
+    cache.clear()
+
+    keys = [f"{i:064x}" for i in range(4)]
+    for idx, key in enumerate(keys):
+        path = cache.store(key, export)
+        # Force a strict least-recently-used order
+        os.utime(path, ns=(idx * 1_000_000_000, idx * 1_000_000_000))
+
+    cache.max_bytes = cache.entry_path(keys[0]).stat().st_size * 2
+    cache.evict()
+
+    assert {p.stem for p in cache.cache_dir.glob("*.npz")} == set(keys[2:])
+
+
+def test_corrupt_entry_is_discarded(cache, vwx_export_file):
+    load_vw_export(vwx_export_file, cache)
+    key = cache.key(vwx_export_file)
+    cache.entry_path(key).write_bytes(b"not a cache entry")
+
+    assert cache.load(key) is None
+    assert not cache.entry_path(key).exists()
@@ -1,6 +1,32 @@
 """Tests for the generate_paperwork CLI."""
 
-from lighting_paperwork.generate_paperwork import main
+import io
+import re
+from pathlib import Path
+
+import openpyxl
+import pypdf
+import pytest
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.workbook import Workbook
+from pandas.io.formats.excel import CSSToExcelConverter
+
+from lighting_paperwork.channel_hookup import ChannelHookup
+from lighting_paperwork.color_cut_list import ColorCutList
+from lighting_paperwork.excel_writer import named_style_kwargs
+from lighting_paperwork.generate_paperwork import (
+    changed_fields,
+    file_signature,
+    main,
+    make_exporter,
+    make_paperwork,
+    wait_for_change,
+)
+from lighting_paperwork.gobo_pull import GoboPullList
+from lighting_paperwork.helpers import ShowData, excel_quirks, html_quirks
+from lighting_paperwork.instrument_schedule import InstrumentSchedule
+from lighting_paperwork.paperwork import PaperworkGenerator
+from lighting_paperwork.paperwork_exporters import ExportExcel, ExportHTML, ExportPDF, merge_pdfs
 
 
 def test_smoke_test():
@@ -13,3 +39,313 @@ def test_smoke_test():
             "tests/TestFile.xml",
         ]
     )
+
+
+def test_unwritable_cache_dir(monkeypatch, tmp_path, vwx_export_file):
+    # The cache directory can't be created under a regular file
+    (tmp_path / "not-a-dir").touch()
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "not-a-dir"))
+    xml_file = Path(vwx_export_file).resolve()
+    monkeypatch.chdir(tmp_path)
+
+    main([str(xml_file), "--html"])
+
+    assert list(tmp_path.glob("*.html"))
+
+
+def test_changed_fields(vwx_export):
+    assert changed_fields(vwx_export, vwx_export.copy()) == set()
+
+    recolored = vwx_export.copy()
+    recolored.loc[0, "Color"] = "R99"
+    assert changed_fields(vwx_export, recolored) == {"Color"}
+
+    removed = vwx_export.drop(index=0).reset_index(drop=True)
+    assert changed_fields(vwx_export, removed) == set(vwx_export.columns)
+
+
+def test_wait_for_change(tmp_path):
+    export_file = tmp_path / "Show.xml"
+    export_file.write_text("before")
+    signature = file_signature(str(export_file))
+
+    export_file.write_text("after, and longer")
+    new_signature = wait_for_change(str(export_file), signature, poll_interval=0, debounce=0.01)
+    assert new_signature != signature
+    assert new_signature == file_signature(str(export_file))
+
+
+def test_html_export_reuses_unchanged_paperwork(monkeypatch, tmp_path, vwx_export):
+    monkeypatch.chdir(tmp_path)
+    show_info = ShowData()
+    exporter = ExportHTML("Paperwork", make_paperwork(vwx_export, show_info))
+    exporter.make()
+
+    rendered = []
+    for cls in (PaperworkGenerator, InstrumentSchedule):
+
+        def counting_make_html(self, make_html=cls.make_html):
+            rendered.append(self)
+            return make_html(self)
+
+        monkeypatch.setattr(cls, "make_html", counting_make_html)
+
+    replacement = ChannelHookup(vwx_export, show_info)
+    exporter.paperwork = [replacement, *exporter.paperwork[1:]]
+    exporter.make()
+
+    assert rendered == [replacement]
+
+
+def parse_css(css):
+    props = {}
+    for declaration in css.split(";"):
+        if declaration.strip():
+            prop, val = declaration.split(":", 1)
+            props[prop.strip()] = val.strip()
+    return props
+
+
+def resolve_class_styles(rules, classes):
+    # `td` rules are less specific than `td.class` rules, otherwise the last rule wins
+    props = {}
+    for rule in sorted(rules, key=lambda r: "." in r["selector"]):
+        selector_class = rule["selector"].removeprefix("td").removeprefix(".")
+        if selector_class == "" or selector_class in classes:
+            props.update(parse_css(rule["props"]))
+    return props
+
+
+@pytest.mark.parametrize(
+    "generator", [ChannelHookup, InstrumentSchedule, ColorCutList, GoboPullList]
+)
+def test_css_classes_match_inline_styles(vwx_export, generator):
+    paperwork = generator(vwx_export).generate_df()
+    tables = (
+        [df for _, df in paperwork.split_by_position()]
+        if isinstance(paperwork, InstrumentSchedule)
+        else [paperwork.df]
+    )
+
+    params = paperwork.style_params()
+    for df in tables:
+        inline = generator.style_data(df, **params)
+        classes = generator.style_classes(df, **params)
+        rules = generator.class_styles(df.columns, **params)
+        for row in range(len(df)):
+            for col in range(len(df.columns)):
+                cell_classes = {f"col{col}", *classes.iloc[row, col].split()}
+                assert resolve_class_styles(rules, cell_classes) == parse_css(inline.iloc[row, col])
+
+
+def test_css_classes_html(vwx_export):
+    inline_html = ChannelHookup(vwx_export).make_html()
+    class_html = ChannelHookup(vwx_export, css_classes=True).make_html()
+
+    assert "run-continues" in class_html
+    assert "_row0_col0" not in class_html
+    assert len(class_html) < len(inline_html)
+
+
+def parse_rules(html):
+    rules = {}
+    for selectors, css in re.findall(r"([^{}]+)\{([^}]*)\}", html):
+        for selector in selectors.split(","):
+            rules[selector.strip()] = parse_css(css)
+    return rules
+
+
+def cell_styles(html):
+    """Return the text and effective inline CSS of each data cell."""
+    rules = parse_rules(html)
+    cells = []
+    for cell in re.finditer(r"<td ([^>]*)>(.*?)</td>", html):
+        attrs, text = cell.groups()
+        if cell_id := re.search(r'id="([^"]+)"', attrs):
+            props = rules.get(f"#{cell_id.group(1)}", {})
+        else:
+            table_id = re.findall(r'<table id="([^"]+)"', html[: cell.start()])[-1]
+            style_class = re.search(r"\bs\d+\b", attrs)
+            assert style_class is not None
+            props = rules.get(f"#{table_id} td.{style_class.group(0)}", {})
+        cells.append((text, props))
+    return cells
+
+
+@pytest.mark.parametrize(
+    "generator", [ChannelHookup, InstrumentSchedule, ColorCutList, GoboPullList]
+)
+def test_stream_html_matches_styler(vwx_export, generator):
+    styler_html = generator(vwx_export).make_html()
+    stream_html = generator(vwx_export, stream_html=True).make_html()
+
+    assert cell_styles(stream_html) == cell_styles(styler_html)
+    assert stream_html.count("<tr") == styler_html.count("<tr")
+
+
+@pytest.mark.parametrize("stream_html", [False, True])
+def test_pagebreak_repeated_index(vwx_export, stream_html):
+    generator = ChannelHookup(vwx_export, stream_html=stream_html)
+    html = generator.make_html()
+    repeated = (generator.df["Chan"] == generator.formatting_quirks.empty_str).sum()
+
+    assert repeated > 0
+    assert html.count('<tr class="repeated-index">') == repeated
+    # One rule no matter how many rows repeat
+    assert html.count("tr.repeated-index {") == 1
+    assert "nth-child" not in html
+
+
+def blank_pdf(widths, title=None):
+    writer = pypdf.PdfWriter()
+    for width in widths:
+        writer.add_blank_page(width=width, height=792)
+    if title is not None:
+        writer.add_metadata({"/Title": title})
+    pdf = io.BytesIO()
+    writer.write(pdf)
+    return pdf.getvalue()
+
+
+def test_merge_pdfs(tmp_path):
+    merged_file = tmp_path / "Paperwork.pdf"
+    merge_pdfs([blank_pdf([100, 200], title="Hookup"), blank_pdf([300])], merged_file)
+
+    merged = pypdf.PdfReader(merged_file)
+    assert [page.mediabox.width for page in merged.pages] == [100, 200, 300]
+    assert merged.metadata is not None
+    assert merged.metadata.title == "Hookup"
+
+
+def test_make_exporter_jobs(vwx_export):
+    show_info = ShowData()
+    exporter = make_exporter("pdf", show_info, make_paperwork(vwx_export, show_info), jobs=4)
+    assert isinstance(exporter, ExportPDF)
+    assert exporter.jobs == 4
+
+
+def test_excel_export_saves_once(monkeypatch, tmp_path, vwx_export):
+    monkeypatch.chdir(tmp_path)
+    saves = []
+    save = Workbook.save
+
+    def counting_save(self, filename):
+        saves.append(filename)
+        return save(self, filename)
+
+    monkeypatch.setattr(Workbook, "save", counting_save)
+    paperwork = [ChannelHookup(vwx_export), ColorCutList(vwx_export)]
+    excel_file = ExportExcel("Paperwork", paperwork).make()
+
+    assert len(saves) == 1
+    wb = openpyxl.load_workbook(excel_file)
+    assert wb.sheetnames == ["Channel Hookup", "Color Cut List"]
+
+
+def excel_cells(ws):
+    return [
+        (
+            cell.coordinate,
+            cell.value,
+            cell.font.name,
+            cell.font.sz,
+            cell.font.b,
+            cell.border.top and cell.border.top.style,
+            cell.border.bottom and cell.border.bottom.style,
+            cell.alignment.horizontal,
+            cell.alignment.vertical,
+            cell.alignment.wrap_text,
+        )
+        for row in ws.iter_rows()
+        for cell in row
+    ]
+
+
+def test_stream_excel_export(monkeypatch, tmp_path, vwx_export):
+    monkeypatch.chdir(tmp_path)
+    show_info = ShowData("Show", "LD", "Rev. A")
+    styler_file = ExportExcel("Styler", make_paperwork(vwx_export, show_info)).make()
+    stream_exporter = make_exporter(
+        "excel", show_info, make_paperwork(vwx_export, show_info), stream_excel=True
+    )
+    assert isinstance(stream_exporter, ExportExcel)
+    assert stream_exporter.stream
+    stream_file = stream_exporter.make()
+
+    styler_wb = openpyxl.load_workbook(styler_file)
+    stream_wb = openpyxl.load_workbook(stream_file)
+    assert stream_wb.sheetnames == styler_wb.sheetnames
+    for styler_ws, stream_ws in zip(styler_wb, stream_wb, strict=True):
+        assert excel_cells(stream_ws) == excel_cells(styler_ws)
+        assert stream_ws.merged_cells.ranges == styler_ws.merged_cells.ranges
+        assert stream_ws.row_breaks.brk == styler_ws.row_breaks.brk
+        assert stream_ws.print_title_rows == styler_ws.print_title_rows
+        assert stream_ws.oddHeader is not None
+        assert styler_ws.oddHeader is not None
+        assert stream_ws.oddHeader.center is not None
+        assert styler_ws.oddHeader.center is not None
+        assert stream_ws.oddHeader.center.text == styler_ws.oddHeader.center.text
+        assert {col: dim.width for col, dim in stream_ws.column_dimensions.items()} == {
+            col: dim.width for col, dim in styler_ws.column_dimensions.items()
+        }
+
+    # Every styled cell shares one of a few named styles
+    assert len(stream_wb.named_styles) < 20
+    ws = stream_wb["Channel Hookup"]
+    assert ws["A1"].style.startswith("Header")
+    assert ws["A2"].style.startswith("Body")
+
+
+def test_named_style_kwargs():
+    converter = CSSToExcelConverter()
+    style = named_style_kwargs(
+        converter(
+            "font-family: Arial; font-weight: bold; font-size: 12pt; color: #FF0000; "
+            "border-bottom: 1px dashed black; text-align: center; "
+            "background-color: #00FF00; number-format: 0.00"
+        )
+    )
+
+    assert style["font"] == Font(name="arial", size=12, bold=True, color="FF0000")
+    assert style["border"] == Border(bottom=Side(style="dashed", color="000000"))
+    assert style["alignment"] == Alignment(horizontal="center")
+    assert style["fill"] == PatternFill(patternType="solid", fgColor="00FF00")
+    assert style["number_format"] == "0.00"
+
+
+def test_stream_html_export(monkeypatch, tmp_path, vwx_export):
+    monkeypatch.chdir(tmp_path)
+    styler_file = ExportHTML("Styler", make_paperwork(vwx_export, ShowData())).make()
+    stream_file = ExportHTML(
+        "Stream", make_paperwork(vwx_export, ShowData(), stream_html=True)
+    ).make()
+
+    stream_html = stream_file.read_text()
+    assert "border-collapse: collapse" not in stream_html
+    assert cell_styles(stream_html) == cell_styles(styler_file.read_text())
+
+
+@pytest.mark.parametrize(
+    "generator", [ChannelHookup, InstrumentSchedule, ColorCutList, GoboPullList]
+)
+def test_generate_df_reuses_base_df(monkeypatch, vwx_export, generator):
+    calls = []
+    generate_base_df = generator.generate_base_df
+
+    def counting_generate_base_df(self):
+        calls.append(self)
+        return generate_base_df(self)
+
+    monkeypatch.setattr(generator, "generate_base_df", counting_generate_base_df)
+
+    paperwork = generator(vwx_export)
+    html_df = paperwork.generate_df().df
+    with paperwork.use_quirks(excel_quirks):
+        excel_df = paperwork.generate_df().df
+    assert paperwork.formatting_quirks == html_quirks
+    assert paperwork.generate_df().df.equals(html_df)
+    assert len(calls) == 1
+
+    fresh = generator(vwx_export)
+    fresh.formatting_quirks = excel_quirks
+    assert excel_df.equals(fresh.generate_df().df)
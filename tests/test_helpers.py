@@ -2,12 +2,18 @@
 
 import re
 
+import pandas as pd
 import pytest
+from natsort import natsort_keygen
 
 from lighting_paperwork.helpers import (
     DMXAddress,
     Gel,
     InstrumentPower,
+    clear_parse_caches,
+    natsort_order,
+    natsort_rank,
+    parse_cache_info,
     parse_frame_size,
 )
 
@@ -127,6 +133,25 @@ def test_parse_frame_size(frame_size, output_str):
     assert parse_frame_size(frame_size) == output_str
 
 
+def test_parse_caches():
+    clear_parse_caches()
+    for _ in range(3):
+        assert InstrumentPower("575W").format() == "575W"
+        assert [g.name for g in Gel.parse_gel("L202x2 + R119")] == ["L202", "L202", "R119"]
+        assert parse_frame_size('6.25"') == '6.25"'
+
+    stats = parse_cache_info()
+    assert (stats["power"].hits, stats["power"].misses) == (2, 1)
+    assert (stats["gel"].hits, stats["gel"].misses) == (2, 1)
+    assert (stats["gel_name"].hits, stats["gel_name"].misses) == (7, 2)
+    assert (stats["frame_size"].hits, stats["frame_size"].misses) == (2, 1)
+
+    # Cached results are never shared between callers
+    gels = Gel.parse_gel("L202x2")
+    gels[0].name = "Modified"
+    assert Gel.parse_gel("L202x2")[0].name == "L202"
+
+
 @pytest.mark.parametrize(
     ("input_addr", "absolute_address"),
     [
@@ -211,6 +236,15 @@ def test_slash_conditional_address(input_addr, output_str):
     assert DMXAddress(input_addr).format_slash_conditional() == output_str
 
 
+def test_slash_conditional_address_array():
+    addresses = [4, 512, 513, 515, 1553, 1024]
+    expected = [DMXAddress(i).format_slash_conditional() for i in addresses]
+    assert DMXAddress.format_slash_conditional_array(addresses).tolist() == expected
+
+    with pytest.raises(ValueError, match="less than 1"):
+        DMXAddress.format_slash_conditional_array([1, 0])
+
+
 @pytest.mark.parametrize(
     ("input_power", "output_str"),
     [
@@ -265,3 +299,22 @@ def test_power_regex(input_str, output_str):
         assert output_str == ""
     else:
         assert pwr.group() == output_str
+
+
+def test_natsort_rank():
+    values = pd.Series(["10", "2", "02", "", "A1", "a2", "1/1", "2"])
+    assert natsort_rank(values).tolist() == [3, 2, 2, 0, 4, 5, 1, 2]
+
+
+def test_natsort_order():
+    df = pd.DataFrame(
+        {
+            "Position": ["LX10", "LX2", "LX2", "FOH", "LX10", "LX2", "LX02"],
+            "U#": ["1", "10", "9", "", "1", "9", "9"],
+            "Row": range(7),
+        }
+    )
+    expected = df.sort_values(by=["Position", "U#"], key=natsort_keygen())  # type: ignore[reportArgumentType]
+    order = natsort_order(df["Position"], df["U#"])
+
+    assert df.iloc[order]["Row"].tolist() == expected["Row"].tolist()
@@ -4,9 +4,11 @@
 import logging
 import re
 
+import openpyxl
 import pytest
 
-from lighting_paperwork.instrument_schedule import InstrumentSchedule
+from lighting_paperwork.instrument_schedule import InstrumentSchedule, position_classifier
+from lighting_paperwork.paperwork_exporters import ExportExcel
 
 
 def test_parse_instrument_schedule(caplog, vwx_export):
@@ -97,6 +99,17 @@ def test_position_sorting():
     ]
 
 
+def test_position_classifier():
+    classify = position_classifier((r".*Boom", r"SL.*"))
+
+    # The first matching regex wins
+    assert classify("SL Boom 3") == 0
+    assert classify("SL Ladder 1") == 1
+    # Unmatched positions sort after every category
+    assert classify("Spot Booth") == 2
+    assert position_classifier((r".*Boom", r"SL.*")) is classify
+
+
 def test_split_by_position(caplog, vwx_export):
     caplog.set_level(logging.WARNING)
     dfs = InstrumentSchedule(vwx_export).generate_df().split_by_position()
@@ -125,3 +138,31 @@ def test_split_by_position(caplog, vwx_export):
     assert third_elec.iloc[5]["U#"] == "&nbsp;"
     assert third_elec.iloc[5]["Chan"] == '"'
     assert third_elec.iloc[5]["Addr"] == '"'
+
+    # Repeated values never carry over from the previous position
+    for _, pos_df in dfs:
+        assert '"' not in pos_df.iloc[0].tolist()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_make_excel(monkeypatch, tmp_path, vwx_export, stream):
+    monkeypatch.chdir(tmp_path)
+    paperwork = InstrumentSchedule(vwx_export)
+    excel_file = ExportExcel("Paperwork", [paperwork], stream=stream).make()
+    positions = paperwork.split_by_position()
+
+    wb = openpyxl.load_workbook(excel_file)
+    assert wb.sheetnames == ["Instrument Schedule"]
+    ws = wb["Instrument Schedule"]
+    assert ws.max_column == 6
+
+    # Each position is a header spanning the table, the column names, its rows,
+    # and an empty row
+    section_row = 1
+    for name, pos_df in positions:
+        assert ws.cell(section_row, 1).value == name
+        assert f"A{section_row}:F{section_row}" in ws.merged_cells
+        assert ws.cell(section_row + 1, 1).value == "U#"
+        assert ws.cell(section_row + 2, 3).value == pos_df.iloc[0, 2]
+        assert ws.cell(section_row + 2, 3).alignment.wrap_text
+        section_row += len(pos_df) + 3
@@ -0,0 +1,103 @@
+"""Tests for the shared ShowModel."""
+
+import logging
+
+import pandas as pd
+
+from lighting_paperwork.channel_hookup import ChannelHookup
+from lighting_paperwork.instrument_schedule import InstrumentSchedule
+from lighting_paperwork.show_model import ShowModel
+
+
+def test_derived_columns_are_shared(monkeypatch, vwx_export):
+    calls = []
+    combine_instrtype = ShowModel.combine_instrtype
+
+    def counting_combine_instrtype(df):
+        calls.append(df)
+        return combine_instrtype(df)
+
+    monkeypatch.setattr(ShowModel, "combine_instrtype", staticmethod(counting_combine_instrtype))
+
+    model = ShowModel(vwx_export)
+    hookup = ChannelHookup(model).generate_df()
+    schedule = InstrumentSchedule(model).generate_df()
+    assert len(calls) == 1
+
+    # Same output as generators with their own model
+    assert hookup.df.equals(ChannelHookup(vwx_export).generate_df().df)
+    assert schedule.df.equals(InstrumentSchedule(vwx_export).generate_df().df)
+
+
+def test_projections_are_independent(vwx_export):
+    model = ShowModel(vwx_export)
+    projection = model.project(["Channel", "Addr"])
+    projection["Addr"] = "Modified"
+    projection.loc[0, "Channel"] = "Modified"
+
+    assert not (model.project(["Addr"])["Addr"] == "Modified").any()
+    assert model.vw_export.loc[0, "Channel"] != "Modified"
+    assert vwx_export.loc[0, "Channel"] != "Modified"
+
+
+def test_missing_fields(caplog):
+    caplog.set_level(logging.WARNING)
+    vw_export = pd.DataFrame({"Channel": ["1"]})
+    model = ShowModel(vw_export)
+
+    assert model.project(["Channel", "Gobo 1"]).to_dict("list") == {
+        "Channel": ["1"],
+        "Gobo 1": [""],
+    }
+    model.project(["Gobo 1"])
+    assert caplog.text.count("Field `Gobo 1` not present in export") == 1
+    assert "Gobo 1" not in vw_export.columns
+
+
+def test_gels():
+    model = ShowModel(pd.DataFrame({"Color": ["R02 + L201x2", "", "R364"]}, index=[5, 6, 7]))
+    gels = model.gels()
+
+    assert gels.index.to_list() == [5, 5, 5, 6, 7]
+    assert gels["Color"].to_list() == ["R02", "L201", "L201", "", "R364"]
+    assert gels["Sort"].to_list() == ["R02", "L201", "L201", "", "R64.3"]
+
+
+def test_determine_power(caplog):
+    caplog.set_level(logging.WARNING)
+    df = pd.DataFrame(
+        {
+            "Channel": ["1", "2", "3", "4", "5"],
+            "Instrument Type": ["PAR 750W", "PAR", "Scoop 1.5 kW", "LED 0W", "Iris"],
+            "Wattage": ["575", "575W", "", "", ""],
+            "Accessory Flag": ["", "", "", "", "1"],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+    power = ShowModel.determine_power(df)
+
+    assert power.to_list() == ["575W", "575W", "1.5kW", "", ""]
+    assert power.index.to_list() == [10, 11, 12, 13, 14]
+    # Accessories don't need power
+    assert [r.getMessage() for r in caplog.records] == [
+        "Channel 1 has conflicting power values (575W, 750W). Using 575W.",
+        "Channel 4 is infinitely efficient (LED 0W is 0W)",
+    ]
+
+
+def test_combine_gelgobo():
+    df = pd.DataFrame(
+        {
+            "Color": ["R02", "", "", "L201", ""],
+            "Gobo 1": ["", "G1", "", "G1", ""],
+            "Gobo 2": ["", "G2", "G2", "", ""],
+            "Accessory Flag": ["", "", "1", "", "1"],
+        }
+    )
+    assert ShowModel.combine_gelgobo(df).to_list() == [
+        "R02",
+        "N/C, T: G1, G2",
+        ", T: G2",
+        "L201, T: G1",
+        "",
+    ]
@@ -0,0 +1,56 @@
+"""Tests for the compiled Styler template registry."""
+
+import pandas as pd
+from pandas.io.formats.style import Styler
+
+from lighting_paperwork.styler_templates import DEFAULT_TEMPLATE, TEMPLATE_DIR, StylerTemplates
+
+
+def test_styler_is_compiled_once():
+    templates = StylerTemplates()
+    styler = templates.styler()
+    assert templates.styler(DEFAULT_TEMPLATE) is styler
+    assert issubclass(styler, Styler)
+
+
+def test_styler_matches_custom_template():
+    df = pd.DataFrame({"A": ["1", "2"], "B": ["x", "y"]})
+    expected = Styler.from_custom_template(str(TEMPLATE_DIR), DEFAULT_TEMPLATE)(df, uuid="t")
+    actual = StylerTemplates().styler()(df, uuid="t")
+
+    actual_html = actual.to_html(generated_header="Header", generated_footer="Footer")
+    expected_html = expected.to_html(generated_header="Header", generated_footer="Footer")
+    assert actual_html == expected_html
+
+
+def test_bytecode_cache(tmp_path):
+    templates = StylerTemplates()
+    templates.enable_bytecode_cache(tmp_path / "templates")
+    templates.styler()
+    assert any((tmp_path / "templates").iterdir())
+
+    # A fresh registry loads the compiled template from the cache
+    cached = StylerTemplates()
+    cached.enable_bytecode_cache(tmp_path / "templates")
+    df = pd.DataFrame({"A": ["1"]})
+    assert cached.styler()(df, uuid="t").to_html() == templates.styler()(df, uuid="t").to_html()
+
+
+def test_tr_classes():
+    df = pd.DataFrame({"A": ["1", "2", "3"]})
+    html = StylerTemplates().styler()(df).set_tr_classes(["", "b", ""]).to_html()
+
+    assert html.count('<tr class="b">') == 1
+    assert html.index('<tr class="b">') < html.index(">2</td>") < html.index(">3</td>")
+    assert html.index(">1</td>") < html.index('<tr class="b">')
+
+
+def test_tr_classes_exclude_styles():
+    df = pd.DataFrame({"A": ["1", "2", "3"]})
+    styler = StylerTemplates().styler()(df, uuid="t").set_tr_classes(["", "b", ""])
+    html = styler.to_html(exclude_styles=True)
+    body = html[html.index("<tbody>") : html.index("</tbody>")].split()
+    expected = Styler(df, uuid="t").to_html(exclude_styles=True)
+
+    assert not any("class=" in token or "id=" in token for token in body)
+    assert body == expected[expected.index("<tbody>") : expected.index("</tbody>")].split()
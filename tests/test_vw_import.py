@@ -2,10 +2,14 @@
 """Tests for the Vectorworks ingester."""
 
 import logging
+import re
+import shutil
 
+import pandas as pd
 import pytest
+from defusedxml.ElementTree import parse as defusedxml_parse
 
-from lighting_paperwork.vectorworks_xml import VWExport
+from lighting_paperwork.vectorworks_xml import IncrementalVWExport, VWExport
 
 
 def test_opening_files(vwx_export_file):
@@ -45,3 +49,127 @@ def test_export_df(vwx_export_file):
     assert len(df) == (pytest.NUM_INSTRUMENTS + pytest.NUM_SMART_ACCS)
     # Additional col for Node UID
     assert len(df.columns) == (len(vwx_export.field_mapping)) + 1
+
+
+def test_streaming_export_df(vwx_export_file):
+    tree_export = VWExport(vwx_export_file, streaming=False)
+    stream_export = VWExport(vwx_export_file)
+
+    assert stream_export.field_mapping == tree_export.field_mapping
+    assert stream_export.export_time == tree_export.export_time
+    assert stream_export.vw_version == tree_export.vw_version
+    assert stream_export.vw_build == tree_export.vw_build
+    assert len(stream_export.instruments) == pytest.NUM_INSTRUMENTS
+
+    pd.testing.assert_frame_equal(stream_export.export_df(), tree_export.export_df())
+
+
+def test_streaming_clears_parsed_nodes(monkeypatch, vwx_export_file):
+    parsed = []
+    parse_instrument = VWExport.parse_instrument
+
+    def checking_parse_instrument(self, instr):
+        # Every node ingested before this one has already been discarded
+        assert all(len(node) == 0 and node.text is None for node in parsed)
+        parse_instrument(self, instr)
+        parsed.append(instr)
+
+    monkeypatch.setattr(VWExport, "parse_instrument", checking_parse_instrument)
+    VWExport(vwx_export_file)
+
+    assert sum("UID" in node.tag for node in parsed) > pytest.NUM_INSTRUMENTS
+
+
+def test_export_df_skips_deleted(vwx_export_file):
+    vwx_export = VWExport(vwx_export_file)
+    deleted = vwx_export.instruments[0]
+    deleted.props["Action"] = "Delete"
+    df = vwx_export.export_df()
+
+    assert len(df) == (pytest.NUM_INSTRUMENTS + pytest.NUM_SMART_ACCS - 1)
+    assert deleted.node_uid not in df["Node Tag"].to_numpy()
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_accessory_before_parent(tmp_path, vwx_export_file, streaming):
+    # Move a smart accessory ahead of its parent instrument
+    tree = defusedxml_parse(vwx_export_file)
+    instrument_data = tree.getroot().find("InstrumentData")
+    acc = instrument_data.find("UID_1005_1_1_1_1")
+    parent = instrument_data.find("UID_1005_1_1_0_1")
+    instrument_data.remove(acc)
+    instrument_data.insert(list(instrument_data).index(parent), acc)
+    reordered_file = tmp_path / "Reordered.xml"
+    tree.write(reordered_file)
+
+    vwx_export = VWExport(str(reordered_file), streaming=streaming)
+
+    assert len(vwx_export.instruments) == pytest.NUM_INSTRUMENTS
+    assert len(vwx_export.accessories) == pytest.NUM_SMART_ACCS + pytest.NUM_DUMB_ACCS
+    parent_instr = next(i for i in vwx_export.instruments if i.node_uid == "UID_1005_1_1_0_1")
+    assert [a.node_uid for a in parent_instr.accs] == ["UID_1005_1_1_1_1"]
+    assert all(a.parent_uid is not None for a in vwx_export.accessories)
+
+
+def test_export_df_repeatable(vwx_export_file):
+    vwx_export = VWExport(vwx_export_file)
+    first = vwx_export.export_df()
+
+    # Smart accessories shouldn't be duplicated into the instrument list
+    assert len(vwx_export.instruments) == pytest.NUM_INSTRUMENTS
+    pd.testing.assert_frame_equal(vwx_export.export_df(), first)
+
+
+def test_incremental_export(tmp_path, vwx_export_file):
+    export_file = tmp_path / "Show.xml"
+    shutil.copy(vwx_export_file, export_file)
+
+    incremental = IncrementalVWExport(str(export_file))
+    pd.testing.assert_frame_equal(incremental.df, VWExport(str(export_file)).export_df())
+    assert incremental.vw_version == VWExport(str(export_file)).vw_version
+
+    # Nothing changed
+    incremental.refresh()
+    assert incremental.changed_uids == set()
+
+    # Change one instrument and delete an instrument with a smart accessory,
+    # editing the raw bytes like Vectorworks would
+    data = export_file.read_bytes()
+    start = data.index(b"<UID_1013_1_1_0_0>")
+    purpose = data.index(b"<Purpose>", start)
+    data = (
+        data[:purpose]
+        + b"<Purpose>Changed</Purpose>"
+        + data[data.index(b"</Purpose>", purpose) + 10 :]
+    )
+    data = re.sub(rb"<(UID_1047_1_1_\d_1)>.*?</\1>", b"", data, flags=re.DOTALL)
+    export_file.write_bytes(data)
+
+    incremental.refresh()
+    assert incremental.changed_uids == {
+        "UID_1013_1_1_0_0",
+        "UID_1047_1_1_0_1",
+        "UID_1047_1_1_1_1",
+    }
+    pd.testing.assert_frame_equal(incremental.df, VWExport(str(export_file)).export_df())
+    assert len(incremental.df) == pytest.NUM_INSTRUMENTS + pytest.NUM_SMART_ACCS - 2
+
+
+def test_incremental_export_reorder(tmp_path, vwx_export_file):
+    export_file = tmp_path / "Show.xml"
+    shutil.copy(vwx_export_file, export_file)
+    incremental = IncrementalVWExport(str(export_file))
+
+    # Move an instrument to the end without changing it
+    data = export_file.read_bytes()
+    match = re.search(rb"<(UID_1013_1_1_0_0)>.*?</\1>", data, flags=re.DOTALL)
+    end = data.index(b"</InstrumentData>")
+    data = data[: match.start()] + data[match.end() : end] + match.group(0) + data[end:]
+    export_file.write_bytes(data)
+
+    incremental.refresh()
+    assert incremental.changed_uids == set()
+    expected = VWExport(str(export_file)).export_df()
+    assert incremental.df["Node Tag"].iloc[pytest.NUM_INSTRUMENTS - 1] == "UID_1013_1_1_0_0"
+    assert (incremental.df.dtypes == expected.dtypes).all()
+    pd.testing.assert_frame_equal(incremental.df, expected)